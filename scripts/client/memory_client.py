@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Async client for the Redis Memory Central /v1 API and MCP server
+Pooled keep-alive connections (HTTP/2 against an https:// endpoint when h2
+is installed; plain http:// stays on HTTP/1.1), retries with jittered backoff, and an optional local cache for working memory reads and
+searches, kept fresh through Redis client-side caching invalidations;
+McpSession speaks JSON-RPC to the MCP server over its HTTP+SSE transport
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+from collections import OrderedDict
+import httpx
+import redis.asyncio as redis
+
+try:
+    import h2  # noqa: F401 - only needed for httpx's HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Statuses worth retrying: overload and gateway errors
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Statuses and errors that mean a request was never processed, so even a
+# non-idempotent request can be sent again
+UNPROCESSED_STATUSES = {429, 503}
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Statuses meaning the API rejected a batch's content; only these are
+# worth bisecting, since overload, auth and server errors fail every half alike
+REJECT_STATUSES = {400, 413, 422}
+
+INVALIDATION_CHANNEL = "__redis__:invalidate"
+
+
+class MemoryCache:
+    """LRU cache with a per-entry TTL
+    
+    While `bypass` is set (no invalidation stream is connected) lookups
+    miss, so nothing possibly stale is served. `put` takes the generation
+    read before the request was sent and drops the value if anything was
+    invalidated in the meantime.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.bypass = False
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        entry = self.entries.get(key) if not self.bypass else None
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def put(self, key, value, generation: int):
+        if self.bypass or generation != self.generation:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def invalidate(self, key):
+        self.generation += 1
+        self.entries.pop(key, None)
+    
+    def invalidate_kind(self, kind: str):
+        self.generation += 1
+        for key in [key for key in self.entries if key[0] == kind]:
+            del self.entries[key]
+    
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+
+
+class CacheInvalidator:
+    """Evict cache entries when the server's Redis keys change
+    
+    One connection subscribes to __redis__:invalidate; a second enables
+    CLIENT TRACKING in broadcast mode for the session and memory prefixes
+    and redirects the invalidations to the first. A working memory key
+    change evicts that session; any memory change evicts all searches.
+    If either connection drops, the cache is bypassed and cleared until
+    tracking is re-established.
+    """
+    
+    def __init__(
+        self,
+        redis_url: str,
+        cache: MemoryCache,
+        session_prefix: str = "session:",
+        memory_prefix: str = "memory:",
+        ping_interval: float = 5.0
+    ):
+        self.redis_url = redis_url
+        self.cache = cache
+        self.session_prefix = session_prefix
+        self.memory_prefix = memory_prefix
+        self.ping_interval = ping_interval
+        self.task = None
+        self.ready = asyncio.Event()
+        self.subscriber = None
+        self.tracker = None
+    
+    async def start(self, timeout: float = 5.0):
+        """Start listening; waits up to `timeout` for the first connection"""
+        self.cache.bypass = True
+        self.task = asyncio.create_task(self.run())
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def connect(self):
+        self.subscriber = redis.from_url(self.redis_url).pubsub()
+        await self.subscriber.connect()
+        connection = self.subscriber.connection
+        await connection.send_command("CLIENT", "ID")
+        client_id = await connection.read_response()
+        await self.subscriber.subscribe(INVALIDATION_CHANNEL)
+        
+        self.tracker = redis.from_url(self.redis_url, single_connection_client=True)
+        await self.tracker.execute_command(
+            "CLIENT", "TRACKING", "ON", "REDIRECT", client_id, "BCAST",
+            "PREFIX", self.session_prefix, "PREFIX", self.memory_prefix
+        )
+    
+    async def disconnect(self):
+        for connection in (self.subscriber, self.tracker):
+            if connection is not None:
+                try:
+                    await connection.aclose()
+                except (redis.RedisError, OSError):
+                    pass
+        self.subscriber = self.tracker = None
+    
+    async def run(self):
+        backoff = 0.5
+        while True:
+            try:
+                await self.connect()
+                # Anything cached while untracked may be stale
+                self.cache.clear()
+                self.cache.bypass = False
+                self.ready.set()
+                backoff = 0.5
+                last_ping = time.monotonic()
+                while True:
+                    message = await self.subscriber.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message["type"] == "message":
+                        self.invalidate(message["data"])
+                    if time.monotonic() - last_ping >= self.ping_interval:
+                        # Tracking dies silently with its connection
+                        await self.tracker.ping()
+                        last_ping = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except (redis.RedisError, OSError):
+                self.cache.bypass = True
+                self.cache.clear()
+                await self.disconnect()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+    
+    def invalidate(self, keys):
+        if keys is None:
+            # FLUSHDB/FLUSHALL
+            self.cache.clear()
+            return
+        for key in keys if isinstance(keys, list) else [keys]:
+            key = key.decode("utf-8") if isinstance(key, bytes) else key
+            if key.startswith(self.session_prefix):
+                self.cache.invalidate(("working_memory", key[len(self.session_prefix):]))
+            elif key.startswith(self.memory_prefix):
+                self.cache.invalidate_kind("search")
+    
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.disconnect()
+
+
+class MemoryClient:
+    """Async client for the /v1 long-term and working memory API
+    
+    Use as `async with MemoryClient(...) as client:`. Pass `cache=True`
+    (or a MemoryCache) to cache working memory reads and searches; with
+    `redis_url` the cache is invalidated as soon as the server's keys
+    change, otherwise entries live for the cache TTL. `http2` only takes
+    effect for an https:// `base_url` (such as the TLS proxy), since
+    httpx negotiates HTTP/2 through TLS ALPN.
+    """
+    
+    def __init__(
+        self,
+        base_url: str = None,
+        http2: bool = True,
+        max_connections: int = 100,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.2,
+        cache=None,
+        redis_url: str = None,
+        transport: httpx.AsyncBaseTransport = None,
+        headers: dict = None
+    ):
+        server_ip = os.getenv("REDIS_MEMORY_IP", "10.10.20.85")
+        self.base_url = base_url or f"http://{server_ip}:8000"
+        self.retries = retries
+        self.backoff = backoff
+        self.http2 = http2 and HTTP2_AVAILABLE and transport is None and self.base_url.startswith("https://")
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=self.http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+            headers=headers
+        )
+        self.cache = MemoryCache() if cache is True else cache or None
+        self.invalidator = CacheInvalidator(redis_url, self.cache) if self.cache and redis_url else None
+        self.retried = 0
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def start(self):
+        if self.invalidator:
+            await self.invalidator.start()
+    
+    async def close(self):
+        if self.invalidator:
+            await self.invalidator.stop()
+        await self.client.aclose()
+    
+    async def request(self, method: str, path: str, idempotent: bool = True, **kwargs):
+        """Send a request, retrying transport errors and overload statuses
+        
+        Backoff is exponential with full jitter, or the server's
+        Retry-After when it sends one. Other error statuses raise
+        httpx.HTTPStatusError. A request that is not `idempotent` is only
+        retried when it cannot have been processed: connection failures
+        and 429/503 answers, not read timeouts or gateway errors.
+        """
+        retryable = RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if attempt == self.retries or not (idempotent or isinstance(e, UNSENT_ERRORS)):
+                    raise
+                response = None
+            
+            if response is not None and response.status_code not in retryable:
+                response.raise_for_status()
+                return response
+            if attempt == self.retries:
+                response.raise_for_status()
+            
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            if response is not None:
+                try:
+                    delay = float(response.headers.get("Retry-After", delay))
+                except ValueError:
+                    pass
+            self.retried += 1
+            await asyncio.sleep(delay)
+    
+    async def health(self):
+        return (await self.request("GET", "/v1/health")).json()
+    
+    async def create_memories(self, memories):
+        """Create long-term memories (dicts with at least "text")
+        
+        Only retried after a timeout when every memory carries an "id",
+        so a create the server did process is overwritten, not duplicated.
+        """
+        memories = list(memories)
+        response = await self.request(
+            "POST", "/v1/long-term-memory",
+            idempotent=all(memory.get("id") for memory in memories),
+            json={"memories": memories}
+        )
+        if self.cache:
+            self.cache.invalidate_kind("search")
+        return response.json()
+    
+    async def create_memory(self, text: str, **fields):
+        return await self.create_memories([dict(fields, text=text)])
+    
+    async def search(self, text: str, limit: int = 10, namespace: str = None, topics=None, **filters):
+        """Semantic search over long-term memory; returns the response body"""
+        body = dict(filters, text=text, limit=limit)
+        if namespace is not None:
+            body["namespace"] = {"eq": namespace}
+        if topics:
+            body["topics"] = {"any": list(topics)}
+        
+        key = ("search", json.dumps(body, sort_keys=True))
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+        result = (await self.request("POST", "/v1/long-term-memory/search", json=body)).json()
+        if self.cache:
+            self.cache.put(key, result, generation)
+        return result
+    
+    async def get_working_memory(self, session_id: str):
+        key = ("working_memory", session_id)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+        result = (await self.request("GET", f"/v1/working-memory/{session_id}")).json()
+        if self.cache:
+            self.cache.put(key, result, generation)
+        return result
+    
+    async def put_working_memory(self, session_id: str, session):
+        try:
+            return (await self.request("PUT", f"/v1/working-memory/{session_id}", json=session)).json()
+        finally:
+            # After the write, so reads racing it cannot cache the old value
+            if self.cache:
+                self.cache.invalidate(("working_memory", session_id))
+    
+    async def delete_working_memory(self, session_id: str):
+        try:
+            await self.request("DELETE", f"/v1/working-memory/{session_id}")
+        finally:
+            if self.cache:
+                self.cache.invalidate(("working_memory", session_id))
+
+
+class BufferedMemoryWriter:
+    """Coalesce long-term memory creates from many coroutines into batches
+    
+    Creates are buffered and sent as one `memories` array when
+    `max_batch` are waiting or `max_delay` seconds after the first one,
+    with up to `max_in_flight` batches in flight. Each create gets its
+    own future, resolving to the memory ID; a batch the API rejects as
+    invalid (400, 413, 422) is split in half until the invalid memories
+    are isolated, while any other error fails the whole batch. Closing the
+    writer (or leaving `async with`) flushes what is left.
+    """
+    
+    def __init__(
+        self,
+        client: MemoryClient,
+        max_batch: int = 100,
+        max_delay: float = 0.05,
+        max_in_flight: int = 4
+    ):
+        self.client = client
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.buffer = []
+        self.timer = None
+        self.tasks = set()
+        self.closed = False
+        self.batches_sent = 0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    def submit(self, memory: dict):
+        """Queue a memory; returns a future resolving to its ID"""
+        if self.closed:
+            raise RuntimeError("BufferedMemoryWriter is closed")
+        memory = dict(memory)
+        # Client-side IDs let every caller learn its memory's ID from one batch
+        memory.setdefault("id", uuid.uuid4().hex)
+        future = asyncio.get_running_loop().create_future()
+        self.buffer.append((memory, future))
+        if len(self.buffer) >= self.max_batch:
+            self.send_buffer()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.max_delay, self.send_buffer)
+        return future
+    
+    async def create(self, text: str, **fields):
+        """Create a memory through the buffer and wait for its ID"""
+        return await self.submit(dict(fields, text=text))
+    
+    def send_buffer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        while self.buffer:
+            batch, self.buffer = self.buffer[:self.max_batch], self.buffer[self.max_batch:]
+            task = asyncio.create_task(self.send(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+    
+    async def send(self, batch):
+        async with self.slots:
+            await self.post(batch)
+    
+    async def post(self, batch):
+        try:
+            await self.client.create_memories([memory for memory, _ in batch])
+            self.batches_sent += 1
+        except httpx.HTTPStatusError as e:
+            if len(batch) > 1 and e.response.status_code in REJECT_STATUSES:
+                middle = len(batch) // 2
+                await self.post(batch[:middle])
+                await self.post(batch[middle:])
+                return
+            self.fail(batch, e)
+            return
+        except Exception as e:
+            self.fail(batch, e)
+            return
+        for memory, future in batch:
+            if not future.done():
+                future.set_result(memory["id"])
+    
+    def fail(self, batch, error):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+    
+    async def flush(self):
+        """Send everything buffered and wait for all batches to finish"""
+        self.send_buffer()
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+    
+    async def close(self):
+        self.closed = True
+        await self.flush()
+
+
+class McpSession:
+    """One MCP client session over the HTTP+SSE transport
+    
+    GET /sse opens the event stream, whose first "endpoint" event names
+    the URL to POST JSON-RPC messages to; responses arrive as "message"
+    events on the stream and are matched to requests by ID.
+    """
+    
+    def __init__(self, client: httpx.AsyncClient, base_url: str, sse_path: str = "/sse"):
+        self.client = client
+        self.base_url = base_url
+        self.sse_path = sse_path
+        self.endpoint = None
+        self.ready = asyncio.Event()
+        self.pending = {}
+        self.next_id = 0
+        self.reader = None
+        self.error = None
+    
+    async def open(self, timeout: float = 10.0):
+        """Open the stream; returns once the endpoint event has arrived"""
+        self.reader = asyncio.create_task(self.read_stream())
+        await asyncio.wait_for(self.ready.wait(), timeout)
+        if self.error:
+            raise self.error
+        if self.endpoint is None:
+            raise ConnectionError("MCP event stream closed before its endpoint event")
+    
+    async def read_stream(self):
+        try:
+            async with self.client.stream(
+                "GET", f"{self.base_url}{self.sse_path}",
+                headers={"Accept": "text/event-stream"}, timeout=None
+            ) as response:
+                response.raise_for_status()
+                event, data = "message", []
+                async for line in response.aiter_lines():
+                    if line:
+                        field, _, value = line.partition(":")
+                        value = value[1:] if value.startswith(" ") else value
+                        if field == "event":
+                            event = value
+                        elif field == "data":
+                            data.append(value)
+                        continue
+                    if data:
+                        self.dispatch(event, "\n".join(data), time.perf_counter())
+                    event, data = "message", []
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(self.error or ConnectionError("MCP event stream closed"))
+    
+    def dispatch(self, event: str, data: str, arrived: float):
+        if event == "endpoint":
+            self.endpoint = data if data.startswith("http") else f"{self.base_url}{data}"
+            self.ready.set()
+            return
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        future = self.pending.pop(message.get("id"), None)
+        if future and not future.done():
+            future.set_result((message, arrived))
+    
+    async def request(self, method: str, params: dict = None, timeout: float = 30.0):
+        """Send a JSON-RPC request; returns (message, POST accepted at, response arrived at)"""
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        response = await self.client.post(self.endpoint, json=message)
+        accepted = time.perf_counter()
+        if response.status_code >= 400:
+            self.pending.pop(request_id, None)
+            response.raise_for_status()
+        reply, arrived = await asyncio.wait_for(future, timeout)
+        if "error" in reply:
+            raise RuntimeError(f"{method}: {reply['error'].get('message', reply['error'])}")
+        return reply, accepted, arrived
+    
+    async def notify(self, method: str, params: dict = None):
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        response = await self.client.post(self.endpoint, json=message)
+        response.raise_for_status()
+    
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+            try:
+                await self.reader
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Measurement helpers shared by the Redis Memory Central scripts
+A bounded latency histogram and RediSearch FT.INFO parsing, used by
+test-connection.py and migrate-memories.py
+"""
+
+import math
+
+# FT.INFO size fields summed into an index's memory footprint
+INDEX_SIZE_FIELDS = (
+    "inverted_sz_mb", "vector_index_sz_mb", "offset_vectors_sz_mb",
+    "doc_table_size_mb", "sortable_values_size_mb", "key_table_size_mb"
+)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with ~1% relative precision
+    
+    Like an HDR histogram, memory stays bounded no matter how many
+    samples are recorded, and percentiles are accurate to a bucket width.
+    """
+    
+    RATIO = 1.01
+    FLOOR = 1e-6
+    
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, seconds: float):
+        bucket = int(math.log(max(seconds, self.FLOOR) / self.FLOOR, self.RATIO))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+    
+    def percentile(self, p: float):
+        if not self.count:
+            return 0.0
+        threshold = self.count * p / 100
+        running = 0
+        for bucket in sorted(self.counts):
+            running += self.counts[bucket]
+            if running >= threshold:
+                return min(self.FLOOR * self.RATIO ** (bucket + 0.5), self.max)
+        return self.max
+    
+    def summary(self):
+        """Count plus mean/p50/p95/p99/max in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+
+def parse_ft_info(raw):
+    """FT.INFO reply as a dict with str field names, whatever the client decoding"""
+    return {
+        (field.decode("utf-8") if isinstance(field, bytes) else field): value
+        for field, value in zip(raw[::2], raw[1::2])
+    }
+
+
+def index_size(info):
+    """Memory footprint in bytes of an index from its parsed FT.INFO"""
+    return sum(float(info.get(field) or 0) for field in INDEX_SIZE_FIELDS) * 1024 * 1024
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the Redis Memory Server API
+Serves the long-term memory, search, working memory and health endpoints
+from an in-memory store with deterministic fake embeddings, either
+in-process through an httpx transport or over HTTP on localhost
+"""
+
+import re
+import json
+import math
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import httpx
+from rich.console import Console
+
+console = Console()
+
+# Dimensions of the fake embeddings; small enough for brute-force search
+EMBEDDING_DIM = 64
+
+WORKING_MEMORY_PATH = re.compile(r"^/v1/working-memory/([^/]+)$")
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM):
+    """Deterministic unit vector for `text` from hashed word features
+    
+    Texts sharing words get similar vectors, so searches rank plausibly
+    and results are identical on every run and machine.
+    """
+    vector = [0.0] * dim
+    for word in re.findall(r"\w+", text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "big") % dim
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+class MemoryStore:
+    """In-memory long-term and working memory, safe to share between threads"""
+    
+    def __init__(self, dim: int = EMBEDDING_DIM, delay: float = 0.0):
+        self.dim = dim
+        self.delay = delay
+        self.memories = {}
+        self.vectors = {}
+        self.sessions = {}
+        self.lock = threading.Lock()
+    
+    def handle(self, method: str, path: str, body=None, params=None):
+        """Route a request; returns (status code, JSON-serialisable body)"""
+        if path == "/v1/health" and method == "GET":
+            return 200, {"status": "healthy", "version": "stub", "redis_connected": True}
+        if path == "/v1/long-term-memory" and method == "POST":
+            return self.create_memories(body or {})
+        if path == "/v1/long-term-memory" and method == "DELETE":
+            with self.lock:
+                deleted = 0
+                for memory_id in (params or {}).get("memory_ids", []):
+                    deleted += self.memories.pop(memory_id, None) is not None
+                    self.vectors.pop(memory_id, None)
+            return 200, {"status": f"ok, deleted {deleted} memories"}
+        if path == "/v1/long-term-memory/search" and method == "POST":
+            return self.search(body or {})
+        if path == "/v1/working-memory" and method == "GET":
+            with self.lock:
+                return 200, {"sessions": sorted(self.sessions), "total": len(self.sessions)}
+        
+        match = WORKING_MEMORY_PATH.match(path)
+        if match:
+            session_id = match.group(1)
+            with self.lock:
+                if method == "PUT":
+                    self.sessions[session_id] = dict(body or {}, session_id=session_id)
+                    return 200, self.sessions[session_id]
+                if method == "GET":
+                    if session_id not in self.sessions:
+                        return 404, {"detail": "Session not found"}
+                    return 200, self.sessions[session_id]
+                if method == "DELETE":
+                    self.sessions.pop(session_id, None)
+                    return 200, {"status": "ok"}
+        return 404, {"detail": "Not Found"}
+    
+    def create_memories(self, body):
+        memories = body.get("memories")
+        if not isinstance(memories, list):
+            return 422, {"detail": "memories must be a list"}
+        entries = []
+        for memory in memories:
+            if not isinstance(memory, dict) or not isinstance(memory.get("text"), str):
+                return 422, {"detail": "every memory needs a text"}
+            memory_id = memory.get("id") or hashlib.blake2b(
+                memory["text"].encode("utf-8"), digest_size=8
+            ).hexdigest()
+            entries.append((memory_id, dict(memory, id=memory_id), fake_embedding(memory["text"], self.dim)))
+        with self.lock:
+            for memory_id, memory, vector in entries:
+                self.memories[memory_id] = memory
+                self.vectors[memory_id] = vector
+        return 200, {"status": "ok"}
+    
+    def search(self, body):
+        query = fake_embedding(body.get("text") or "", self.dim)
+        limit = int(body.get("limit", 10))
+        offset = int(body.get("offset", 0))
+        namespace = (body.get("namespace") or {}).get("eq")
+        topics = set((body.get("topics") or {}).get("any") or [])
+        
+        with self.lock:
+            candidates = [
+                (memory, self.vectors[memory_id])
+                for memory_id, memory in self.memories.items()
+                if (namespace is None or memory.get("namespace") == namespace)
+                and (not topics or topics.intersection(memory.get("topics") or []))
+            ]
+        scored = sorted(
+            (
+                (1.0 - sum(a * b for a, b in zip(query, vector)), memory["id"], memory)
+                for memory, vector in candidates
+            ),
+            key=lambda item: (item[0], item[1])
+        )
+        results = [
+            dict(memory, dist=round(distance, 6))
+            for distance, _, memory in scored[offset:offset + limit]
+        ]
+        return 200, {"memories": results, "results": results, "total": len(scored)}
+
+
+def transport(store: MemoryStore = None):
+    """httpx transport answering every request from `store` in-process"""
+    store = store or MemoryStore()
+    
+    async def handler(request: httpx.Request):
+        if store.delay:
+            await asyncio.sleep(store.delay)
+        try:
+            body = json.loads(request.content) if request.content else None
+        except ValueError:
+            return httpx.Response(422, json={"detail": "Invalid JSON"})
+        params = {key: request.url.params.get_list(key) for key in request.url.params}
+        status, payload = store.handle(request.method, request.url.path, body, params)
+        return httpx.Response(status, json=payload)
+    
+    return httpx.MockTransport(handler)
+
+
+def make_handler(store: MemoryStore):
+    """BaseHTTPRequestHandler class serving `store` over HTTP"""
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def respond(self):
+            if store.delay:
+                time.sleep(store.delay)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else None
+                path, _, query = self.path.partition("?")
+                status, payload = store.handle(self.command, path, body, parse_qs(query))
+            except ValueError:
+                status, payload = 422, {"detail": "Invalid JSON"}
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        do_GET = do_POST = do_PUT = do_DELETE = respond
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return StubHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, store: MemoryStore = None):
+    """Start the stand-in server on a background thread and return it"""
+    server = ThreadingHTTPServer((host, port), make_handler(store or MemoryStore()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run an offline stand-in for the Redis Memory Server API"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.0,
+        help="Fixed delay added to every response, in seconds (default: 0)"
+    )
+    parser.add_argument(
+        "--dim",
+        type=int,
+        default=EMBEDDING_DIM,
+        help=f"Fake embedding dimensions (default: {EMBEDDING_DIM})"
+    )
+    args = parser.parse_args()
+    
+    server = serve(args.host, args.port, MemoryStore(args.dim, args.delay))
+    console.print(f"[green]Stand-in memory server listening on http://{args.host}:{args.port}[/green]")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopping stand-in server[/yellow]")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
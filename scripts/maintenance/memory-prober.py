@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Synthetic prober for Redis Memory Central
+Runs the Redis, API, search, working memory and MCP checks on an interval
+over pooled connections and exposes client-side latency histograms and
+success counters on its own /metrics endpoint
+"""
+
+import os
+import sys
+import time
+import socket
+import signal
+import asyncio
+import argparse
+import httpx
+import redis.asyncio as redis
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client"))
+from memory_client import McpSession
+
+console = Console()
+
+# Histogram bucket upper bounds in seconds, Prometheus client defaults
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+CHECKS = ("redis", "api_health", "create", "search", "working_memory", "mcp")
+
+
+class ProbeMetrics:
+    """Latency histograms and outcome counters per check"""
+    
+    def __init__(self):
+        self.buckets = {check: [0] * len(BUCKETS) for check in CHECKS}
+        self.sums = {check: 0.0 for check in CHECKS}
+        self.counts = {check: 0 for check in CHECKS}
+        self.outcomes = {check: {"success": 0, "failure": 0} for check in CHECKS}
+        self.last_success = {check: 0 for check in CHECKS}
+        self.last_run = {check: 0.0 for check in CHECKS}
+    
+    def observe(self, check: str, seconds: float, ok: bool):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[check][i] += 1
+        self.sums[check] += seconds
+        self.counts[check] += 1
+        self.outcomes[check]["success" if ok else "failure"] += 1
+        self.last_success[check] = 1 if ok else 0
+        self.last_run[check] = time.time()
+    
+    def exposition(self):
+        """Prometheus text exposition of every check"""
+        lines = [
+            "# HELP memory_probe_duration_seconds Client-perceived duration of each probe check",
+            "# TYPE memory_probe_duration_seconds histogram"
+        ]
+        for check in CHECKS:
+            for bound, count in zip(BUCKETS, self.buckets[check]):
+                lines.append(f'memory_probe_duration_seconds_bucket{{check="{check}",le="{bound}"}} {count}')
+            lines.append(f'memory_probe_duration_seconds_bucket{{check="{check}",le="+Inf"}} {self.counts[check]}')
+            lines.append(f'memory_probe_duration_seconds_sum{{check="{check}"}} {self.sums[check]:.6f}')
+            lines.append(f'memory_probe_duration_seconds_count{{check="{check}"}} {self.counts[check]}')
+        lines += [
+            "# HELP memory_probe_total Probe checks run, by result",
+            "# TYPE memory_probe_total counter"
+        ]
+        for check in CHECKS:
+            for result, count in self.outcomes[check].items():
+                lines.append(f'memory_probe_total{{check="{check}",result="{result}"}} {count}')
+        lines += [
+            "# HELP memory_probe_success Whether the last run of the check succeeded",
+            "# TYPE memory_probe_success gauge"
+        ]
+        for check in CHECKS:
+            lines.append(f'memory_probe_success{{check="{check}"}} {self.last_success[check]}')
+        lines += [
+            "# HELP memory_probe_last_run_timestamp_seconds When the check last ran",
+            "# TYPE memory_probe_last_run_timestamp_seconds gauge"
+        ]
+        for check in CHECKS:
+            lines.append(f'memory_probe_last_run_timestamp_seconds{{check="{check}"}} {self.last_run[check]:.3f}')
+        return "\n".join(lines) + "\n"
+
+
+class MemoryProber:
+    def __init__(self, server_ip: str = None, interval: float = 15.0, timeout: float = 10.0):
+        self.server_ip = server_ip or os.getenv("REDIS_MEMORY_IP", "10.10.20.85")
+        self.api_url = f"http://{self.server_ip}:8000"
+        self.mcp_url = f"http://{self.server_ip}:9000"
+        self.redis_url = f"redis://{self.server_ip}:16379"
+        self.interval = interval
+        self.metrics = ProbeMetrics()
+        
+        self.timeout = timeout
+        # One pool per service, reused by every round; the MCP check holds
+        # its event stream open while posting, so it needs a second connection
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=len(CHECKS) + 1, max_keepalive_connections=len(CHECKS) + 1)
+        )
+        self.redis = redis.from_url(self.redis_url, socket_timeout=timeout, max_connections=2)
+        
+        # Fixed IDs: every round overwrites the same records instead of
+        # leaving new ones behind, and shutdown removes them
+        prober_id = f"prober_{socket.gethostname()}"
+        self.memory_id = f"{prober_id}_memory"
+        self.session_id = f"{prober_id}_session"
+    
+    async def check_redis(self):
+        return await self.redis.ping()
+    
+    async def check_api_health(self):
+        response = await self.client.get(f"{self.api_url}/v1/health")
+        response.raise_for_status()
+        return response.json().get("status") == "healthy"
+    
+    async def check_create(self):
+        response = await self.client.post(f"{self.api_url}/v1/long-term-memory", json={"memories": [{
+            "id": self.memory_id,
+            "text": "Synthetic probe memory",
+            "memory_type": "semantic",
+            "namespace": "prober",
+            "topics": ["probe"],
+            "entities": []
+        }]})
+        response.raise_for_status()
+        return True
+    
+    async def check_search(self):
+        response = await self.client.post(f"{self.api_url}/v1/long-term-memory/search", json={
+            "text": "synthetic probe",
+            "limit": 1,
+            "namespace": {"eq": "prober"}
+        })
+        response.raise_for_status()
+        return True
+    
+    async def check_working_memory(self):
+        url = f"{self.api_url}/v1/working-memory/{self.session_id}"
+        response = await self.client.put(url, json={
+            "messages": [{"role": "user", "content": "Synthetic probe"}],
+            "context": "Prober session"
+        })
+        response.raise_for_status()
+        response = await self.client.get(url)
+        response.raise_for_status()
+        return True
+    
+    async def check_mcp(self):
+        """Open the SSE stream and round-trip initialize over it"""
+        session = McpSession(self.client, self.mcp_url)
+        try:
+            await session.open(self.timeout)
+            reply, _, _ = await session.request("initialize", {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "memory-prober", "version": "1.0.0"}
+            }, self.timeout)
+            return "protocolVersion" in reply.get("result", {})
+        finally:
+            await session.close()
+    
+    async def run_check(self, check: str):
+        """Run one check, recording its latency and outcome"""
+        start = time.perf_counter()
+        try:
+            ok = bool(await getattr(self, f"check_{check}")())
+            error = None if ok else "unexpected response"
+        except Exception as e:
+            ok, error = False, str(e) or type(e).__name__
+        elapsed = time.perf_counter() - start
+        self.metrics.observe(check, elapsed, ok)
+        return check, ok, elapsed, error
+    
+    async def run_round(self):
+        return await asyncio.gather(*(self.run_check(check) for check in CHECKS))
+    
+    async def run(self, stop: asyncio.Event):
+        """Probe every `interval` seconds until `stop` is set"""
+        while not stop.is_set():
+            started = time.perf_counter()
+            for check, ok, elapsed, error in await self.run_round():
+                if not ok:
+                    console.print(f"[red]{check} failed after {elapsed * 1000:.0f}ms: {error}[/red]")
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, self.interval - (time.perf_counter() - started)))
+            except asyncio.TimeoutError:
+                pass
+    
+    async def serve_metrics(self, reader, writer):
+        """Minimal HTTP handler for GET /metrics"""
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.metrics.exposition().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def cleanup(self):
+        """Remove the probe memory and session from the server"""
+        requests = [
+            self.client.delete(
+                f"{self.api_url}/v1/long-term-memory",
+                params={"memory_ids": [self.memory_id]}
+            ),
+            self.client.delete(f"{self.api_url}/v1/working-memory/{self.session_id}")
+        ]
+        for result in await asyncio.gather(*requests, return_exceptions=True):
+            if isinstance(result, Exception):
+                console.print(f"[yellow]⚠️  Cleanup failed: {result}[/yellow]")
+            elif result.status_code >= 400 and result.status_code != 404:
+                console.print(f"[yellow]⚠️  Cleanup returned {result.status_code} for {result.request.url.path}[/yellow]")
+    
+    async def close(self):
+        await self.client.aclose()
+        await self.redis.aclose()
+    
+    def display_round(self, results):
+        table = Table(title="Probe Results")
+        table.add_column("Check", style="cyan")
+        table.add_column("Status")
+        table.add_column("Latency", style="yellow")
+        table.add_column("Error", style="red")
+        for check, ok, elapsed, error in results:
+            table.add_row(
+                check,
+                "[green]✅ OK[/green]" if ok else "[red]❌ FAIL[/red]",
+                f"{elapsed * 1000:.1f}ms",
+                error or ""
+            )
+        console.print(table)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Continuously probe Redis Memory Central and export Prometheus metrics"
+    )
+    parser.add_argument(
+        "--server",
+        default=os.getenv("REDIS_MEMORY_IP", "10.10.20.85"),
+        help="Server IP address (default: 10.10.20.85)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=15.0,
+        help="Seconds between probe rounds (default: 15)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="Per-request timeout in seconds (default: 10)"
+    )
+    parser.add_argument(
+        "--listen",
+        default="0.0.0.0:9464",
+        help="Address for the /metrics endpoint (default: 0.0.0.0:9464)"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single round, print the results and exit"
+    )
+    
+    args = parser.parse_args()
+    
+    prober = MemoryProber(args.server, args.interval, args.timeout)
+    try:
+        if args.once:
+            results = await prober.run_round()
+            prober.display_round(results)
+            if not all(ok for _, ok, _, _ in results):
+                sys.exit(1)
+            return
+        
+        host, _, port = args.listen.rpartition(":")
+        server = await asyncio.start_server(prober.serve_metrics, host or "0.0.0.0", int(port))
+        console.print(f"[green]Probing {args.server} every {args.interval:g}s, metrics on http://{args.listen}/metrics[/green]")
+        
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        
+        async with server:
+            await prober.run(stop)
+        console.print("\n[yellow]Stopping prober[/yellow]")
+    finally:
+        await prober.cleanup()
+        await prober.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Prober interrupted by user[/yellow]")
+        sys.exit(1)
@@ -8,150 +8,2344 @@ import sys
 import json
 import asyncio
 import argparse
+import time
+import math
+import random
+import mmap
+import zlib
+import base64
+import struct
+import sqlite3
+import tempfile
+import hashlib
+import heapq
+import unicodedata
+import statistics
 from datetime import datetime
-import redis
+import redis.asyncio as redis
 import httpx
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn
 from rich.table import Table
 
+# Measurement helpers and API statuses shared with the client scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "client"))
+from memory_stats import LatencyHistogram, parse_ft_info, index_size
+from memory_client import REJECT_STATUSES
+
 console = Console()
 
+# Hash field holding the float32 embedding of a long-term memory
+VECTOR_FIELD = "vector"
+
+# Memory fields compared by verification, in digest order
+VERIFY_FIELDS = ("id", "text", "namespace", "topics")
+
+# Idle-time buckets for the keyspace analysis, as (label, upper bound in seconds)
+AGE_BUCKETS = (("< 1h", 3600), ("1h - 1d", 86400), ("1d - 7d", 604800), ("7d - 30d", 2592000), ("> 30d", None))
+
+# Sessions idle for less than this many seconds count as active for probes
+ACTIVE_IDLE = 3600
+
+# Compare-and-act on a session: applies only if the value still hashes to
+# what was read, so concurrent updates from the server are never lost
+SESSION_CAS_SCRIPT = """
+if redis.sha1hex(redis.call('GET', KEYS[1]) or '') ~= ARGV[1] then return 0 end
+if ARGV[2] == 'set' then redis.call('SET', KEYS[1], ARGV[3], 'KEEPTTL')
+elseif ARGV[2] == 'del' then redis.call('DEL', KEYS[1])
+else redis.call('EXPIRE', KEYS[1], ARGV[3], 'LT') end
+return 1
+"""
+
+
+class AdaptiveBatchSizer:
+    """Tune the long-term memory batch size from observed latency and errors
+    
+    Sizes grow while requests finish well under `target_latency` and shrink
+    when they run over it. A sustained error rate halves the size.
+    """
+    
+    def __init__(
+        self,
+        initial: int,
+        maximum: int = 500,
+        target_latency: float = 2.0,
+        max_error_rate: float = 0.05
+    ):
+        self.size = max(1, min(initial, maximum))
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.latency = None
+        self.error_rate = 0.0
+    
+    def record(self, latency: float, ok: bool):
+        """Feed one request outcome back into the controller"""
+        alpha = 0.2
+        self.latency = latency if self.latency is None else (
+            alpha * latency + (1 - alpha) * self.latency
+        )
+        self.error_rate = alpha * (0.0 if ok else 1.0) + (1 - alpha) * self.error_rate
+        
+        if self.error_rate > self.max_error_rate and not ok:
+            self.size = max(1, self.size // 2)
+        elif self.latency > self.target_latency:
+            self.size = max(1, int(self.size * 0.75))
+        elif self.latency < self.target_latency / 2 and self.error_rate <= self.max_error_rate:
+            self.size = min(self.maximum, max(self.size + 1, int(self.size * 1.25)))
+
+
+class MigrationMetrics:
+    """Per-stage throughput, waits and request latencies of a migration
+    
+    Stages: scan (SCAN-only round trips), fetch (pipelines returning
+    values, which also carry the next SCAN), decode, post (target API
+    requests) and load (direct target Redis writes). Waits record time
+    blocked on the export queue, the import queue, the concurrency limit
+    and retry backoff.
+    """
+    
+    STAGES = ("scan", "fetch", "decode", "post", "load")
+    WAITS = ("queue_put", "queue_get", "concurrency_limit", "retry_backoff")
+    
+    def __init__(self):
+        self.started_at = datetime.now().isoformat()
+        self.started = time.perf_counter()
+        self.stages = {
+            stage: {"items": 0, "bytes": 0, "seconds": 0.0} for stage in self.STAGES
+        }
+        self.waits = {wait: 0.0 for wait in self.WAITS}
+        self.latency = {}
+    
+    def record(self, stage: str, seconds: float, items: int = 0, size: int = 0):
+        entry = self.stages[stage]
+        entry["items"] += items
+        entry["bytes"] += size
+        entry["seconds"] += seconds
+    
+    def wait(self, name: str, seconds: float):
+        self.waits[name] += seconds
+    
+    def request(self, op: str, seconds: float):
+        self.latency.setdefault(op, LatencyHistogram()).record(seconds)
+    
+    def report(self, stats, config=None):
+        """Machine-readable summary of the run so far"""
+        elapsed = time.perf_counter() - self.started
+        return {
+            "started_at": self.started_at,
+            "elapsed_seconds": round(elapsed, 3),
+            "config": config or {},
+            "stats": stats,
+            "stages": {
+                stage: dict(
+                    entry,
+                    seconds=round(entry["seconds"], 3),
+                    items_per_second=round(entry["items"] / entry["seconds"], 1) if entry["seconds"] else 0.0,
+                    bytes_per_second=round(entry["bytes"] / entry["seconds"], 1) if entry["seconds"] else 0.0
+                )
+                for stage, entry in self.stages.items()
+            },
+            "waits_seconds": {wait: round(seconds, 3) for wait, seconds in self.waits.items()},
+            "latency": {op: histogram.summary() for op, histogram in self.latency.items()}
+        }
+    
+    def exposition(self, stats):
+        """Prometheus text exposition of the current counters"""
+        lines = [
+            "# TYPE migration_stage_items_total counter",
+            "# TYPE migration_stage_bytes_total counter",
+            "# TYPE migration_stage_seconds_total counter"
+        ]
+        for stage, entry in self.stages.items():
+            lines.append(f'migration_stage_items_total{{stage="{stage}"}} {entry["items"]}')
+            lines.append(f'migration_stage_bytes_total{{stage="{stage}"}} {entry["bytes"]}')
+            lines.append(f'migration_stage_seconds_total{{stage="{stage}"}} {entry["seconds"]:.6f}')
+        lines.append("# TYPE migration_wait_seconds_total counter")
+        for wait, seconds in self.waits.items():
+            lines.append(f'migration_wait_seconds_total{{wait="{wait}"}} {seconds:.6f}')
+        lines.append("# TYPE migration_request_duration_seconds summary")
+        for op, histogram in self.latency.items():
+            for quantile in (0.5, 0.95, 0.99):
+                lines.append(
+                    f'migration_request_duration_seconds{{op="{op}",quantile="{quantile}"}} '
+                    f'{histogram.percentile(quantile * 100):.6f}'
+                )
+            lines.append(f'migration_request_duration_seconds_sum{{op="{op}"}} {histogram.total:.6f}')
+            lines.append(f'migration_request_duration_seconds_count{{op="{op}"}} {histogram.count}')
+        lines.append("# TYPE migration_records_total counter")
+        for name, value in stats.items():
+            if isinstance(value, int):
+                lines.append(f'migration_records_total{{counter="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def value_size(value):
+    """Approximate wire size of a fetched hash or string value"""
+    if isinstance(value, dict):
+        return sum(len(k) + len(v) for k, v in value.items())
+    if isinstance(value, list):
+        return sum(len(item) for item in value if isinstance(item, (bytes, str)))
+    return len(value) if value else 0
+
+
+def route_of(url: str):
+    """Collapse per-session URLs so latencies aggregate per endpoint"""
+    if url.startswith("/v1/working-memory/"):
+        return "/v1/working-memory/{session_id}"
+    return url
+
+
+class AIMDController:
+    """Additive-increase/multiplicative-decrease limit on in-flight requests
+    
+    The limit grows by roughly one per round trip of successful requests
+    and is halved on a congestion signal: 429/5xx responses, timeouts,
+    slow target probes or a deep task queue. Decreases happen at most once
+    per smoothed round trip, since the requests already in flight when the
+    target pushed back carry the same signal. With `minimum == maximum`
+    it is a plain fixed-size limit.
+    """
+    
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.limit = float(self.minimum)
+        self.rtt = 0.1
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.decreases = 0
+    
+    async def acquire(self):
+        async with self.condition:
+            while self.in_flight >= int(self.limit):
+                await self.condition.wait()
+            self.in_flight += 1
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def release(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+    
+    def success(self, latency: float):
+        self.rtt = 0.8 * self.rtt + 0.2 * latency
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+    
+    def congestion(self, retry_after: float = None):
+        now = time.monotonic()
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+        if self.minimum < self.maximum and now - self.last_decrease >= self.rtt:
+            self.limit = max(self.minimum, self.limit / 2)
+            self.last_decrease = now
+            self.decreases += 1
+
+
+class MigrationCheckpoint:
+    """Persist migration progress so an interrupted run can resume
+    
+    Tracks, per record kind, the SCAN cursor up to which every record has
+    been handled, the keys acknowledged by the target beyond that cursor,
+    and the keys that failed. The file is rewritten atomically.
+    """
+    
+    def __init__(self, path: str, source: str, target: str):
+        self.path = path
+        self.state = {
+            "source": source,
+            "target": target,
+            "cursors": {"memory": 0, "session": 0},
+            "complete": {"memory": False, "session": False},
+            "failed": {}
+        }
+        self.acked = set()
+        self.pending = {"memory": [], "session": []}
+        self.dirty = False
+    
+    def load(self):
+        """Load a previous run's progress; returns False if there is none"""
+        if not os.path.exists(self.path):
+            return False
+        
+        with open(self.path) as f:
+            state = json.load(f)
+        if (state["source"], state["target"]) != (self.state["source"], self.state["target"]):
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to {state['source']} -> {state['target']}"
+            )
+        self.acked = set(state.pop("acked", []))
+        self.state = state
+        return True
+    
+    def save(self):
+        """Atomically write the checkpoint to disk"""
+        state = dict(self.state, acked=sorted(self.acked), saved_at=datetime.now().isoformat())
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+    
+    def start_page(self, kind: str, cursor, keys, remaining: int):
+        """Register a SCAN page with `remaining` records about to be imported
+        
+        `keys` lists every key of the page, including ones skipped as
+        already acknowledged. A `cursor` of None marks a replay of earlier
+        failures, which must not move the resume cursor when it completes.
+        """
+        page = {"cursor": cursor, "keys": list(keys), "remaining": remaining}
+        self.pending[kind].append(page)
+        self.advance(kind)
+        return page
+    
+    def done(self, kind: str, page, key: str, error: str = None):
+        """Record the outcome of one record of `page`"""
+        if error:
+            self.state["failed"][key] = error
+        else:
+            self.acked.add(key)
+            self.state["failed"].pop(key, None)
+        page["remaining"] -= 1
+        self.advance(kind)
+        self.dirty = True
+    
+    def advance(self, kind: str):
+        """Move the resume cursor past every fully handled leading page
+        
+        Keys of those pages are dropped from the acked set: a resumed
+        SCAN starts after them, so the set only grows with the window
+        of pages still in flight.
+        """
+        pending = self.pending[kind]
+        while pending and pending[0]["remaining"] == 0:
+            page = pending.pop(0)
+            self.acked.difference_update(page["keys"])
+            if page["cursor"] is None:
+                continue
+            self.state["cursors"][kind] = page["cursor"]
+            if page["cursor"] == 0:
+                self.state["complete"][kind] = True
+            self.dirty = True
+    
+    def is_done(self, key: str):
+        return key in self.acked
+
+
+class DumpWriter:
+    """Write memories and sessions to a compact offline dump file
+    
+    Layout: an 8 byte magic, then chunks of up to `chunk_records` records
+    of one kind, each a (compressed length, record count) header followed
+    by zlib-compressed NDJSON. A JSON index of chunk offsets per kind and
+    a footer pointing at it close the file, so readers can seek straight
+    to any chunk. Until then, `sync` keeps the index of every chunk on
+    disk in a `.index` sidecar, so a file cut short by a crash still
+    reads back up to the last sync. `exclusive` refuses an existing path.
+    """
+    
+    MAGIC = b"RMCDUMP1"
+    CHUNK_HEADER = struct.Struct("<II")
+    FOOTER = struct.Struct("<Q8s")
+    
+    def __init__(self, path: str, chunk_records: int = 1000, exclusive: bool = False):
+        self.path = path
+        self.chunk_records = chunk_records
+        if exclusive and os.path.exists(path + ".index"):
+            raise FileExistsError(f"{path}.index exists: an earlier run did not finish")
+        self.file = open(path, "xb" if exclusive else "wb")
+        self.file.write(self.MAGIC)
+        self.index = {"memory": [], "session": []}
+        self.kind = None
+        self.lines = []
+        self.raw_bytes = 0
+    
+    def add(self, kind: str, record):
+        if kind != self.kind:
+            self.flush()
+            self.kind = kind
+        self.lines.append(self.encode(kind, record))
+        if len(self.lines) >= self.chunk_records:
+            self.flush()
+    
+    @staticmethod
+    def encode(kind: str, record):
+        data = record["data"]
+        binary = [field for field, value in data.items() if isinstance(value, bytes)] \
+            if kind == "memory" else []
+        if binary:
+            data = dict(data)
+            for field in binary:
+                data[field] = base64.b64encode(data[field]).decode("ascii")
+        entry = {"key": record["key"], "data": data}
+        if binary:
+            entry["binary"] = binary
+        return json.dumps(entry, separators=(",", ":")).encode("utf-8")
+    
+    def flush(self):
+        if not self.lines:
+            return
+        raw = b"\n".join(self.lines)
+        compressed = zlib.compress(raw)
+        offset = self.file.tell()
+        self.file.write(self.CHUNK_HEADER.pack(len(compressed), len(self.lines)))
+        self.file.write(compressed)
+        self.index[self.kind].append([offset, len(compressed), len(self.lines)])
+        self.raw_bytes += len(raw)
+        self.lines = []
+    
+    def sync(self):
+        """Make every record added so far durable and readable after a crash"""
+        self.flush()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        temporary = self.path + ".index.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path + ".index")
+    
+    def close(self):
+        self.flush()
+        index_offset = self.file.tell()
+        self.file.write(json.dumps(self.index).encode("utf-8"))
+        self.file.write(self.FOOTER.pack(index_offset, self.MAGIC))
+        size = self.file.tell()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        if os.path.exists(self.path + ".index"):
+            os.remove(self.path + ".index")
+        return size
+
+
+class DumpReader:
+    """Read a DumpWriter file through a memory map, one chunk at a time
+    
+    A file without a footer is read through its `.index` sidecar, which
+    covers every chunk synced before the writer stopped.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(DumpWriter.MAGIC)] != DumpWriter.MAGIC:
+            raise ValueError(f"{path} is not a memory dump")
+        index_offset, magic = DumpWriter.FOOTER.unpack(self.map[-DumpWriter.FOOTER.size:]) \
+            if len(self.map) >= len(DumpWriter.MAGIC) + DumpWriter.FOOTER.size else (0, b"")
+        if magic == DumpWriter.MAGIC:
+            self.index = json.loads(self.map[index_offset:-DumpWriter.FOOTER.size])
+        elif os.path.exists(path + ".index"):
+            with open(path + ".index") as f:
+                self.index = json.load(f)
+            console.print(f"[yellow]⚠️  {path} was not closed; reading the chunks in {path}.index[/yellow]")
+        else:
+            raise ValueError(f"{path} has no footer and no {path}.index: it was cut short before any sync")
+    
+    def count(self, kind: str):
+        return sum(chunk[2] for chunk in self.index[kind])
+    
+    def chunk(self, kind: str, number: int):
+        """Decompress and decode the `number`th chunk of `kind`"""
+        offset, length, _ = self.index[kind][number]
+        start = offset + DumpWriter.CHUNK_HEADER.size
+        raw = zlib.decompress(self.map[start:start + length])
+        return [self.decode(line) for line in raw.split(b"\n")]
+    
+    @staticmethod
+    def decode(line: bytes):
+        entry = json.loads(line)
+        for field in entry.pop("binary", []):
+            entry["data"][field] = base64.b64decode(entry["data"][field])
+        return entry
+    
+    async def pages(self, kind: str, cursor: int = 0):
+        """Yield (cursor, records) per chunk, like the SCAN-based export
+        
+        The cursor is the next chunk number, 0 after the last chunk.
+        """
+        chunks = len(self.index[kind])
+        for number in range(cursor, chunks):
+            records = self.chunk(kind, number)
+            yield (number + 1) % chunks, records
+            await asyncio.sleep(0)
+    
+    def find(self, keys):
+        """Return (kind, record) for the given keys by scanning the dump"""
+        wanted = set(keys)
+        found = []
+        for kind in ("memory", "session"):
+            for number in range(len(self.index[kind])):
+                found.extend(
+                    (kind, record) for record in self.chunk(kind, number)
+                    if record["key"] in wanted
+                )
+        return found
+    
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class DedupCache:
+    """On-disk content-hash index shared across migration runs
+    
+    Keeps a text-hash -> embedding cache, and remembers per target which
+    normalised (text, namespace) contents were already migrated so that
+    duplicates from other workstations are collapsed. Rows claimed by a
+    run that died before the target acknowledged them are discarded on
+    open.
+    """
+    
+    def __init__(self, path: str, target: str):
+        self.target = target
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (text_hash TEXT PRIMARY KEY, vector BLOB)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS contents ("
+            "target TEXT, content_hash TEXT, memory_key TEXT, status TEXT, "
+            "PRIMARY KEY (target, content_hash))"
+        )
+        self.db.execute(
+            "DELETE FROM contents WHERE target = ? AND status = 'pending'", (target,)
+        )
+        self.db.commit()
+        self.writes = 0
+    
+    @staticmethod
+    def normalize(text: str):
+        return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+    
+    def text_hash(self, text: str):
+        return hashlib.blake2b(self.normalize(text).encode(), digest_size=16).hexdigest()
+    
+    def content_hash(self, text: str, namespace):
+        content = f"{self.normalize(text)}\0{namespace or ''}"
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+    
+    def claim(self, content_hash: str, key: str):
+        """Reserve a content for `key`; False if another key already has it"""
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO contents VALUES (?, ?, ?, 'pending')",
+            (self.target, content_hash, key)
+        )
+        self.wrote()
+        return cursor.rowcount == 1
+    
+    def settle(self, content_hash: str, ok: bool):
+        """Confirm a claimed content, or release it if the import failed"""
+        if ok:
+            self.db.execute(
+                "UPDATE contents SET status = 'done' WHERE target = ? AND content_hash = ?",
+                (self.target, content_hash)
+            )
+        else:
+            self.db.execute(
+                "DELETE FROM contents WHERE target = ? AND content_hash = ?",
+                (self.target, content_hash)
+            )
+        self.wrote()
+    
+    def get_vector(self, text_hash: str):
+        row = self.db.execute(
+            "SELECT vector FROM embeddings WHERE text_hash = ?", (text_hash,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def put_vector(self, text_hash: str, vector: bytes):
+        self.db.execute(
+            "INSERT OR REPLACE INTO embeddings VALUES (?, ?)", (text_hash, vector)
+        )
+        self.wrote()
+    
+    def wrote(self):
+        self.writes += 1
+        if self.writes % 1000 == 0:
+            self.db.commit()
+    
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+class LeafIndex:
+    """Temporary on-disk (bucket, id, leaf) table for `verify`
+    
+    Holds the leaf digests of both sides so memory stays bounded by the
+    bucket digests; only the buckets the tree walk finds differing are
+    read back. The file is removed on close.
+    """
+    
+    SIDES = ("source", "target")
+    
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix="verify-", suffix=".sqlite")
+        os.close(fd)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE leaves (bucket TEXT, side TEXT, id TEXT, leaf BLOB)")
+    
+    def add(self, side: str, rows):
+        """Insert (bucket, id, leaf) rows for one side"""
+        self.db.executemany(
+            "INSERT INTO leaves VALUES (?, ?, ?, ?)",
+            ((bucket, side, memory_id, leaf) for bucket, memory_id, leaf in rows)
+        )
+    
+    def finish(self):
+        """Index the loaded leaves by bucket before they are read back"""
+        self.db.execute("CREATE INDEX leaves_bucket ON leaves (bucket)")
+        self.db.commit()
+    
+    def load(self, bucket: str):
+        """({id: leaf} for the source, {id: leaf} for the target) in `bucket`"""
+        sides = {side: {} for side in self.SIDES}
+        for side, memory_id, leaf in self.db.execute(
+            "SELECT side, id, leaf FROM leaves WHERE bucket = ?", (bucket,)
+        ):
+            sides[side][memory_id] = leaf
+        return sides["source"], sides["target"]
+    
+    def close(self):
+        self.db.close()
+        os.remove(self.path)
+
+
+def format_bytes(size: float):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def format_duration(seconds: float):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s"
+
+
 class MemoryMigrator:
-    def __init__(self, source_url: str, target_url: str):
+    def __init__(
+        self,
+        source_url: str,
+        target_url: str,
+        scan_count: int = 1000,
+        pipeline_depth: int = 1000,
+        queue_size: int = 1000,
+        concurrency: int = 8,
+        batch_size: int = 1,
+        max_batch_size: int = 500,
+        target_latency: float = 2.0,
+        checkpoint: MigrationCheckpoint = None,
+        target_redis_url: str = None,
+        vector_dim: int = 1536,
+        dedup: DedupCache = None,
+        dump: DumpReader = None,
+        adaptive_concurrency: bool = False,
+        max_probe_latency: float = 0.2,
+        task_queue_key: str = None,
+        max_task_queue: int = 1000,
+        max_retries: int = 5,
+        pushgateway: str = None
+    ):
         self.source_redis = redis.from_url(source_url)
+        # Opened on demand for scans that must not touch LRU state
+        self.untouched = None
         self.target_api = target_url
+        # Memories that already carry an embedding are written straight into
+        # the central index over Redis, bypassing the API and re-embedding
+        self.target_redis = redis.from_url(target_redis_url) if target_redis_url else None
+        self.vector_bytes = vector_dim * 4
+        # One pooled keep-alive client shared by every import worker
+        self.client = httpx.AsyncClient(
+            base_url=target_url,
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+                keepalive_expiry=30.0
+            ),
+            timeout=30.0
+        )
+        # Health probes and metric pushes get their own connections, so
+        # they never queue behind imports and measure only the target
+        self.probe_client = httpx.AsyncClient(
+            base_url=target_url,
+            limits=httpx.Limits(max_connections=2, max_keepalive_connections=2),
+            timeout=10.0
+        )
+        self.scan_count = scan_count
+        self.pipeline_depth = pipeline_depth
+        self.queue_size = queue_size
+        self.concurrency = concurrency
+        # Caps in-flight target writes; adaptive mode starts at one and
+        # backs off when the target shows signs of strain
+        self.controller = AIMDController(
+            concurrency, minimum=1 if adaptive_concurrency else concurrency
+        )
+        self.adaptive_concurrency = adaptive_concurrency
+        self.max_probe_latency = max_probe_latency
+        self.task_queue_key = task_queue_key
+        self.max_task_queue = max_task_queue
+        self.max_retries = max_retries
+        self.metrics = MigrationMetrics()
+        self.pushgateway = pushgateway
+        # Batch mode packs several memories into each POST; 1 keeps one per request
+        self.batcher = AdaptiveBatchSizer(
+            batch_size, max_batch_size, target_latency
+        ) if batch_size > 1 else None
+        self.checkpoint = checkpoint
+        self.dedup = dedup
+        # When set, records are read from an offline dump instead of Redis
+        self.dump = dump
         self.stats = {
             "memories_migrated": 0,
             "sessions_migrated": 0,
-            "errors": 0
+            "errors": 0,
+            "batches_sent": 0,
+            "batch_splits": 0,
+            "skipped": 0,
+            "deletes_forwarded": 0,
+            "embeddings_preserved": 0,
+            "embeddings_mismatched": 0,
+            "duplicates_collapsed": 0,
+            "retries": 0,
+            "embedding_cache_hits": 0,
+            "keys_exported": 0,
+            "export_seconds": 0.0
         }
     
     async def migrate(self):
-        """Main migration process"""
+        """Main migration process
+        
+        Export and import run concurrently: the exporter streams records
+        into a bounded queue and import workers drain it, so memory use
+        stays flat regardless of the size of the source keyspace.
+        """
         console.print("[bold green]Starting Redis Memory Migration[/bold green]")
         
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
             console=console
         ) as progress:
+            task = progress.add_task("Migrating to central server...", total=None)
+            workers = [
+                asyncio.create_task(self.import_worker(queue, progress, task))
+                for _ in range(self.concurrency)
+            ]
+            if self.checkpoint:
+                workers.append(asyncio.create_task(self.checkpoint_saver()))
+            if self.adaptive_concurrency:
+                workers.append(asyncio.create_task(self.monitor_target()))
+            if self.pushgateway:
+                workers.append(asyncio.create_task(self.push_metrics()))
             
-            # Step 1: Export memories
-            task = progress.add_task("Exporting memories from source...", total=None)
-            memories = await self.export_memories()
-            progress.update(task, completed=True)
+            try:
+                exported = await self.produce(queue, progress, task)
+                progress.update(task, total=exported)
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                if self.checkpoint:
+                    self.checkpoint.save()
+        
+        # Show results
+        self.show_results()
+    
+    async def export_dump(self, path: str, chunk_records: int = 1000):
+        """Write every memory and session on the source to a dump file"""
+        console.print(f"[bold green]Exporting source to {path}[/bold green]")
+        writer = DumpWriter(path, chunk_records)
+        counts = {"memory": 0, "session": 0}
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            task = progress.add_task("Exporting...", total=None)
+            try:
+                for kind, export in (("memory", self.export_memories), ("session", self.export_sessions)):
+                    async for _, records in export():
+                        for record in records:
+                            writer.add(kind, record)
+                        counts[kind] += len(records)
+                        progress.update(task, description=(
+                            f"Exporting... {counts['memory']} memories, {counts['session']} sessions"
+                        ))
+            finally:
+                size = writer.close()
+        
+        table = Table(title="Export Results")
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="green")
+        table.add_row("Memories", str(counts["memory"]))
+        table.add_row("Sessions", str(counts["session"]))
+        table.add_row("File Size", f"{size / 1024 / 1024:,.1f} MiB")
+        table.add_row("Compression", f"{writer.raw_bytes / max(size, 1):.1f}x")
+        table.add_row("Export Rate", f"{self.export_rate():,.0f} keys/s")
+        console.print(table)
+    
+    async def plan(self, sample_size: int = 1000, probes: int = 5):
+        """Estimate a migration without writing anything to the target
+        
+        Samples the source keyspace for record counts, payload sizes and
+        existing embeddings, times the source round trips, and probes the
+        target with read-only health and search calls. The estimate
+        assumes export and import overlap, as they do when streaming.
+        """
+        console.print("[bold green]Planning Redis Memory Migration (dry run)[/bold green]")
+        
+        if self.dump:
+            counts, samples, source = await self.sample_dump()
+        else:
+            counts, samples, source = await self.sample_source(sample_size)
+        target = await self.probe_target(probes)
+        
+        memories = samples["memory"]
+        sessions = samples["session"]
+        with_vector = sum(1 for memory in memories if self.has_vector(memory))
+        vector_share = with_vector / len(memories) if memories else 0.0
+        payload_sizes = []
+        malformed = 0
+        for memory in memories:
+            try:
+                payload_sizes.append(len(json.dumps(self.memory_payload(memory))))
+            except ValueError:
+                malformed += 1
+        memory_bytes = statistics.mean(payload_sizes) if payload_sizes else 0
+        session_bytes = statistics.mean(
+            len(json.dumps(session["data"])) for session in sessions
+        ) if sessions else 0
+        
+        direct = counts["memory"] * vector_share if self.target_redis else 0
+        via_api = counts["memory"] - direct
+        batch_size = self.batcher.size if self.batcher else 1
+        requests = math.ceil(via_api / batch_size) + counts["session"]
+        
+        # Per request: one round trip plus an embedding per memory in the
+        # batch, using the search probe (one query embedding) as the cost
+        embed_cost = max(target["search"] - target["health"], 0.0)
+        memory_seconds = math.ceil(via_api / batch_size) * (
+            target["health"] + batch_size * embed_cost
+        ) / self.concurrency
+        session_seconds = counts["session"] * target["health"] / self.concurrency
+        direct_seconds = direct * source["per_key"]
+        export_seconds = (
+            (counts["memory"] + counts["session"]) * source["per_key"]
+            + (counts["memory"] + counts["session"]) / self.scan_count * source["rtt"]
+        )
+        import_seconds = memory_seconds + session_seconds + direct_seconds
+        
+        table = Table(title="Migration Plan (nothing was written)")
+        table.add_column("Estimate", style="cyan")
+        table.add_column("Value", style="green")
+        table.add_row("Memories", f"{counts['memory']:,.0f}")
+        table.add_row("Sessions", f"{counts['session']:,.0f}")
+        table.add_row("Avg Memory Payload", f"{memory_bytes:,.0f} bytes")
+        table.add_row("Avg Session Payload", f"{session_bytes:,.0f} bytes")
+        table.add_row("Total Payload", format_bytes(
+            counts["memory"] * memory_bytes + counts["session"] * session_bytes
+        ))
+        table.add_row("Malformed In Sample", f"{malformed} of {len(memories)}")
+        table.add_row("Memories With Embeddings", f"{vector_share:.0%}")
+        table.add_row("Loaded Directly (no re-embed)", f"{direct:,.0f}")
+        table.add_row("Embedded By Target", f"{via_api:,.0f}")
+        table.add_row("API Requests", f"{requests:,}")
+        table.add_row("Source Round Trip", f"{source['rtt'] * 1000:.1f}ms")
+        table.add_row("Target Health Latency", f"{target['health'] * 1000:.1f}ms")
+        table.add_row("Target Search Latency", f"{target['search'] * 1000:.1f}ms")
+        table.add_row("Batch Size / Concurrency", f"{batch_size} / {self.concurrency}")
+        table.add_row("Export Time", format_duration(export_seconds))
+        table.add_row("Import Time", format_duration(import_seconds))
+        table.add_row("Expected Duration", format_duration(max(export_seconds, import_seconds)))
+        console.print(table)
+    
+    async def sample_source(self, sample_size: int):
+        """Estimate record counts and fetch a sample of records from Redis"""
+        start = time.perf_counter()
+        dbsize = await self.source_redis.dbsize()
+        rtt = time.perf_counter() - start
+        counts = {"memory": 0, "session": 0}
+        
+        if dbsize <= sample_size * 10:
+            # Small keyspace: an exact key-only SCAN is cheap enough
+            keys = [key async for key in self.source_redis.scan_iter(count=self.scan_count)]
+            sampled = keys
+            for key in keys:
+                for kind in counts:
+                    if key.startswith(f"{kind}:".encode()):
+                        counts[kind] += 1
+        else:
+            pipe = self.source_redis.pipeline(transaction=False)
+            for _ in range(sample_size):
+                pipe.randomkey()
+            sampled = [key for key in await pipe.execute() if key]
+            for kind in counts:
+                share = sum(1 for key in sampled if key.startswith(f"{kind}:".encode())) / len(sampled)
+                counts[kind] = round(dbsize * share)
+        
+        keys = [key.decode("utf-8") for key in dict.fromkeys(sampled)
+                if key.startswith((b"memory:", b"session:"))][:sample_size]
+        start = time.perf_counter()
+        fetched = await self.fetch_records(keys)
+        per_key = (time.perf_counter() - start) / len(keys) if keys else 0.0
+        
+        samples = {"memory": [], "session": []}
+        for kind, record in fetched:
+            samples[kind].append(record)
+        return counts, samples, {"rtt": rtt, "per_key": per_key}
+    
+    async def sample_dump(self):
+        """Exact counts from the dump index, sampled from the first chunks"""
+        counts = {kind: self.dump.count(kind) for kind in ("memory", "session")}
+        samples = {
+            kind: self.dump.chunk(kind, 0) if self.dump.index[kind] else []
+            for kind in counts
+        }
+        return counts, samples, {"rtt": 0.0, "per_key": 0.0}
+    
+    async def probe_target(self, probes: int):
+        """Median latency of read-only health and search calls on the target"""
+        latencies = {"health": [], "search": []}
+        for _ in range(probes):
+            start = time.perf_counter()
+            try:
+                response = await self.probe_client.get("/v1/health")
+                response.raise_for_status()
+                latencies["health"].append(time.perf_counter() - start)
+            except Exception as e:
+                console.print(f"[yellow]⚠️  Health probe failed: {e}[/yellow]")
             
-            # Step 2: Export sessions
-            task = progress.add_task("Exporting sessions from source...", total=None)
-            sessions = await self.export_sessions()
-            progress.update(task, completed=True)
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(
+                    "/v1/long-term-memory/search",
+                    json={"text": "migration planning probe", "limit": 1}
+                )
+                response.raise_for_status()
+                latencies["search"].append(time.perf_counter() - start)
+            except Exception as e:
+                console.print(f"[yellow]⚠️  Search probe failed: {e}[/yellow]")
+        
+        health = statistics.median(latencies["health"]) if latencies["health"] else 0.0
+        search = statistics.median(latencies["search"]) if latencies["search"] else health
+        return {"health": health, "search": search}
+    
+    async def verify(self, depth: int = 4, show: int = 20):
+        """Check that every source memory exists unchanged in the target Redis
+        
+        Both keyspaces are read exactly once, fetching only the compared
+        fields, into per-bucket digests keyed by the first `depth` hex digits
+        of the ID hash. The digests form a Merkle-style tree that is walked
+        from the root into differing buckets only. The (ID, leaf digest)
+        pairs from that single pass go to a temporary SQLite table indexed
+        by bucket, and only the differing buckets are loaded back to name
+        the differences, so memory is bounded by the bucket digests. Redis
+        I/O is one fields-only read per side; the comparison work scales
+        with the differences. Returns True when both sides match.
+        """
+        console.print("[bold green]Verifying migrated memories[/bold green]")
+        start = time.perf_counter()
+        leaves = LeafIndex()
+        try:
+            (source_buckets, source_count), (target_buckets, target_count) = await asyncio.gather(
+                self.bucket_digests(self.source_redis, depth, leaves, "source"),
+                self.bucket_digests(self.target_redis, depth, leaves, "target")
+            )
             
-            # Step 3: Import to target
-            task = progress.add_task("Importing to central server...", total=len(memories) + len(sessions))
+            # Walk the tree: a node's digest is the sum of its children's, so
+            # only the children of differing nodes need comparing
+            source_tree = self.digest_tree(source_buckets, depth)
+            target_tree = self.digest_tree(target_buckets, depth)
+            del source_buckets, target_buckets
+            nodes = [""]
+            compared = 0
+            for level in range(depth + 1):
+                compared += len(nodes)
+                differing = [
+                    node for node in nodes
+                    if source_tree[level].get(node, 0) != target_tree[level].get(node, 0)
+                ]
+                if level == depth or not differing:
+                    break
+                nodes = [node + digit for node in differing for digit in "0123456789abcdef"]
             
-            # Import memories
-            for memory in memories:
+            if differing:
+                leaves.finish()
+                counts, samples = self.diff_buckets(differing, leaves, show)
+        finally:
+            leaves.close()
+        
+        table = Table(title="Verification Results")
+        table.add_column("Check", style="cyan")
+        table.add_column("Value", style="green")
+        table.add_row("Source memories", str(source_count))
+        table.add_row("Target memories", str(target_count))
+        table.add_row("Buckets compared", f"{compared} of {sum(16 ** level for level in range(depth + 1))}")
+        table.add_row("Buckets differing", str(len(differing)))
+        
+        if differing:
+            table.add_row("Missing from target", str(counts["Missing"]))
+            table.add_row("Only in target", str(counts["Only in target"]))
+            table.add_row("Content differs", str(counts["Differs"]))
+        table.add_row("Duration", format_duration(time.perf_counter() - start))
+        console.print(table)
+        
+        if not differing:
+            console.print("[bold green]✅ Target matches source[/bold green]")
+            return True
+        for label, ids in samples.items():
+            for memory_id in ids:
+                console.print(f"  {label}: {memory_id}")
+        console.print("[bold red]❌ Target does not match source[/bold red]")
+        return False
+    
+    async def verify_leaves(self, client):
+        """Yield (bucket hash, leaf digest, id) for every memory in `client`
+        
+        Only the compared fields are fetched, so embeddings never leave Redis.
+        """
+        async for _, keys, values in self.scan_pages("memory:*", "hash", client=client, fields=VERIFY_FIELDS):
+            for key, fields in zip(keys, values):
+                if not any(fields):
+                    continue
+                record = [value.decode("utf-8") if value is not None else "" for value in fields]
+                memory_id = record[0] or key.decode("utf-8").split(":", 1)[-1]
                 try:
-                    await self.import_memory(memory)
-                    self.stats["memories_migrated"] += 1
-                except Exception as e:
-                    console.print(f"[red]Error migrating memory: {e}[/red]")
-                    self.stats["errors"] += 1
-                progress.advance(task)
-            
-            # Import sessions
-            for session in sessions:
+                    # Topics compare as a set, whatever order they were stored in
+                    record[3] = json.dumps(sorted(json.loads(record[3] or "[]")))
+                except (ValueError, TypeError):
+                    pass
+                leaf = hashlib.blake2b(
+                    "\x1f".join([memory_id] + record[1:]).encode("utf-8"), digest_size=16
+                ).digest()
+                bucket = hashlib.blake2b(memory_id.encode("utf-8"), digest_size=8).hexdigest()
+                yield bucket, leaf, memory_id
+    
+    async def bucket_digests(self, client, depth: int, leaves: LeafIndex, side: str):
+        """Sum the leaf digests of `client` into buckets of `depth` hex digits
+        
+        Returns (bucket digests, record count); the leaves are written to
+        `leaves` as `side` so differing buckets can be diffed without a re-read.
+        """
+        buckets = {}
+        rows = []
+        count = 0
+        async for bucket, leaf, memory_id in self.verify_leaves(client):
+            prefix = bucket[:depth]
+            buckets[prefix] = (buckets.get(prefix, 0) + int.from_bytes(leaf, "big")) % (1 << 128)
+            rows.append((prefix, memory_id, leaf))
+            count += 1
+            if len(rows) >= self.scan_count:
+                leaves.add(side, rows)
+                rows = []
+        leaves.add(side, rows)
+        return buckets, count
+    
+    def digest_tree(self, buckets, depth: int):
+        """Per-level node digests, each the sum of the buckets under its prefix"""
+        levels = [{} for _ in range(depth + 1)]
+        levels[depth] = buckets
+        for level in range(depth - 1, -1, -1):
+            for prefix, digest in levels[level + 1].items():
+                node = prefix[:level]
+                levels[level][node] = (levels[level].get(node, 0) + digest) % (1 << 128)
+        return levels
+    
+    def diff_buckets(self, buckets, leaves: LeafIndex, show: int):
+        """Count the missing, extra and changed memory IDs within `buckets`
+        
+        Buckets are loaded from `leaves` one at a time. Returns the counts
+        and the `show` smallest IDs of each kind, by label.
+        """
+        counts = {"Missing": 0, "Only in target": 0, "Differs": 0}
+        samples = {label: [] for label in counts}
+        for bucket in buckets:
+            source, target = leaves.load(bucket)
+            found = {
+                "Missing": source.keys() - target.keys(),
+                "Only in target": target.keys() - source.keys(),
+                "Differs": [
+                    memory_id for memory_id in source.keys() & target.keys()
+                    if source[memory_id] != target[memory_id]
+                ]
+            }
+            for label, ids in found.items():
+                counts[label] += len(ids)
+                samples[label] = heapq.nsmallest(show, samples[label] + list(ids))
+        return counts, samples
+    
+    async def analyze(self, match: str = "*", rate: float = 2000.0, top: int = 20, max_groups: int = 1000):
+        """Report where memory goes in the source keyspace
+        
+        Streams SCAN pages with pipelined MEMORY USAGE and OBJECT IDLETIME
+        (which leave LRU state alone) and aggregates bytes by key family,
+        memory namespace and session idle time, keeping the `top` largest
+        keys in a heap. Reading a memory's namespace would mark it as
+        recently used, so namespaces are only read over a CLIENT NO-TOUCH
+        connection (Redis 7.2+) and skipped otherwise. At most `max_groups`
+        families and namespaces are tracked, the rest fold into "(other)",
+        and the scan is throttled to `rate` keys per second so it is safe
+        against production.
+        """
+        console.print(f"[bold green]Analyzing keyspace ({match}, {rate:g} keys/s)[/bold green]")
+        client = await self.untouched_client()
+        if not client:
+            console.print(
+                "[yellow]⚠️  The source has no CLIENT NO-TOUCH (Redis < 7.2); skipping the namespace "
+                "breakdown so the scan leaves LRU state alone.[/yellow]"
+            )
+        families = {}
+        namespaces = {}
+        ages = {label: [0, 0] for label, _ in AGE_BUCKETS}
+        largest = []
+        scanned = 0
+        start = time.perf_counter()
+        
+        def add(groups, name, size):
+            if name not in groups and len(groups) >= max_groups:
+                name = "(other)"
+            entry = groups.setdefault(name, [0, 0])
+            entry[0] += 1
+            entry[1] += size
+        
+        dbsize = await self.source_redis.dbsize()
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            console=console
+        ) as progress:
+            task = progress.add_task("Sampling key sizes...", total=dbsize)
+            async for _, keys, values in self.scan_pages(
+                match, "usage", client=client, fields=("namespace",) if client else None
+            ):
+                for key, (size, idle, *namespace) in zip(keys, values):
+                    if not isinstance(size, int):
+                        # Deleted since the SCAN
+                        continue
+                    name = key.decode("utf-8", errors="replace")
+                    add(families, name.split(":", 1)[0] if ":" in name else "(no prefix)", size)
+                    if name.startswith("memory:") and namespace:
+                        label = namespace[0].decode("utf-8") if isinstance(namespace[0], bytes) else "(none)"
+                        add(namespaces, label, size)
+                    if name.startswith("session:") and isinstance(idle, int):
+                        label = next(label for label, bound in AGE_BUCKETS if bound is None or idle < bound)
+                        ages[label][0] += 1
+                        ages[label][1] += size
+                    if len(largest) < top:
+                        heapq.heappush(largest, (size, name))
+                    elif size > largest[0][0]:
+                        heapq.heapreplace(largest, (size, name))
+                
+                scanned += len(keys)
+                progress.update(task, completed=min(scanned, dbsize))
+                # Throttle: never run ahead of the allowed key rate
+                ahead = scanned / rate - (time.perf_counter() - start)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+        
+        memory_info = await self.source_redis.info("memory")
+        indexes = await self.index_footprint()
+        total = sum(size for _, size in families.values())
+        
+        def group_table(title, column, groups):
+            table = Table(title=title)
+            table.add_column(column, style="cyan")
+            table.add_column("Keys", style="green")
+            table.add_column("Bytes", style="yellow")
+            table.add_column("Avg", style="white")
+            table.add_column("Share", style="white")
+            for name, (count, size) in sorted(groups.items(), key=lambda item: -item[1][1])[:top]:
+                table.add_row(
+                    name, str(count), format_bytes(size),
+                    format_bytes(size / count) if count else "-",
+                    f"{size / total:.1%}" if total else "-"
+                )
+            return table
+        
+        console.print(group_table("Key Families", "Prefix", families))
+        if namespaces:
+            console.print(group_table("Memories by Namespace", "Namespace", namespaces))
+        if any(count for count, _ in ages.values()):
+            console.print(group_table("Sessions by Idle Time", "Idle", {
+                label: entry for label, entry in ages.items() if entry[0]
+            }))
+        
+        table = Table(title=f"Largest {len(largest)} Keys")
+        table.add_column("Key", style="cyan")
+        table.add_column("Bytes", style="yellow")
+        for size, name in sorted(largest, reverse=True):
+            table.add_row(name, format_bytes(size))
+        console.print(table)
+        
+        if indexes:
+            table = Table(title="Search Indexes")
+            table.add_column("Index", style="cyan")
+            table.add_column("Docs", style="green")
+            table.add_column("Memory", style="yellow")
+            for name, (docs, size) in indexes.items():
+                table.add_row(name, str(docs), format_bytes(size))
+            console.print(table)
+        
+        used = memory_info.get("used_memory", 0)
+        maxmemory = memory_info.get("maxmemory", 0)
+        console.print(
+            f"\nScanned {scanned} keys in {format_duration(time.perf_counter() - start)}: "
+            f"{format_bytes(total)} in keys, {format_bytes(sum(size for _, size in indexes.values()))} in indexes, "
+            f"{format_bytes(used)} used" + (f" of {format_bytes(maxmemory)} maxmemory ({used / maxmemory:.0%})" if maxmemory else "")
+        )
+        return {"families": families, "namespaces": namespaces, "ages": ages, "largest": sorted(largest, reverse=True)}
+    
+    async def untouched_client(self):
+        """A source client whose reads leave LRU and LFU state alone, or None
+        
+        Every connection it opens runs CLIENT NO-TOUCH ON, so scans that
+        must read values do not make keys look recently used to eviction.
+        Returns None when the source predates Redis 7.2.
+        """
+        if self.untouched:
+            return self.untouched
+        try:
+            await self.source_redis.execute_command("CLIENT", "NO-TOUCH", "OFF")
+        except redis.ResponseError:
+            return None
+        
+        async def connect(connection):
+            await connection.on_connect()
+            await connection.send_command("CLIENT", "NO-TOUCH", "ON")
+            await connection.read_response()
+        
+        pool = self.source_redis.connection_pool
+        self.untouched = redis.Redis(connection_pool=redis.ConnectionPool(
+            connection_class=pool.connection_class,
+            **dict(pool.connection_kwargs, redis_connect_func=connect)
+        ))
+        return self.untouched
+    
+    async def compact_sessions(
+        self,
+        window_size: int = 20,
+        idle_days: float = None,
+        archive: str = None,
+        expire_in: int = 86400,
+        compact: bool = False,
+        probes: int = 100,
+        report_only: bool = False
+    ):
+        """Trim, expire or archive working memory sessions in place
+        
+        Sessions keep their last `window_size` messages. Sessions idle for
+        `idle_days` are written to the `archive` dump and deleted, or
+        given a TTL of `expire_in` seconds without one; any later update
+        by the server clears that TTL again. `compact` re-encodes the JSON
+        without whitespace. Every write is a compare-and-set against the
+        value that was read. Read and write latency is probed on up to
+        `probes` active sessions before and after. Reads never refresh the
+        idle time of a session that is left alone (see `aged_sessions`).
+        """
+        console.print(
+            f"[bold green]Compacting sessions[/bold green] (window {window_size}"
+            + (f", idle after {idle_days:g}d" if idle_days else "")
+            + (", report only" if report_only else "") + ")"
+        )
+        idle_limit = idle_days * 86400 if idle_days else None
+        cas = self.source_redis.register_script(SESSION_CAS_SCRIPT)
+        probe_keys = await self.active_sessions(probes, idle_limit)
+        before = await self.probe_sessions(probe_keys, None if report_only else cas)
+        used_before = (await self.source_redis.info("memory")).get("used_memory", 0)
+        
+        counts = {
+            "sessions": 0, "trimmed": 0, "messages_dropped": 0, "reencoded": 0,
+            "archived": 0, "expired": 0, "conflicts": 0, "malformed": 0
+        }
+        size_before = size_after = 0
+        writer = DumpWriter(archive, exclusive=True) if archive and not report_only else None
+        
+        try:
+            async for keys, values in self.aged_sessions(idle_limit, read_idle=not report_only):
+                actions = []
+                archived = []
+                for key, (idle, raw, size) in zip(keys, values):
+                    is_idle = idle_limit and isinstance(idle, int) and idle >= idle_limit
+                    if not isinstance(raw, bytes) and not (report_only and is_idle and size):
+                        # Deleted since the SCAN
+                        continue
+                    counts["sessions"] += 1
+                    size_before += size
+                    
+                    if is_idle and raw is None:
+                        # Report only, without NO-TOUCH: counted but never read
+                        counts["archived" if archive else "expired"] += 1
+                        size_after += 0 if archive else size
+                        continue
+                    digest = hashlib.sha1(raw).hexdigest()
+                    
+                    if is_idle:
+                        if writer:
+                            try:
+                                writer.add("session", self.decode_session(key, raw))
+                            except ValueError:
+                                counts["malformed"] += 1
+                                size_after += len(raw)
+                                continue
+                            archived.append((key, digest, len(raw)))
+                        elif archive:
+                            actions.append((key, digest, "del", "", "archived", len(raw), 0, 0))
+                        else:
+                            actions.append((key, digest, "expire", expire_in, "expired", len(raw), len(raw), 0))
+                        continue
+                    
+                    try:
+                        session = json.loads(raw)
+                    except ValueError:
+                        counts["malformed"] += 1
+                        size_after += len(raw)
+                        continue
+                    messages = session.get("messages") if isinstance(session, dict) else None
+                    trimmed = isinstance(messages, list) and len(messages) > window_size
+                    dropped = 0
+                    if trimmed:
+                        session["messages"] = messages[-window_size:] if window_size else []
+                        dropped = len(messages) - len(session["messages"])
+                    if trimmed or compact:
+                        encoded = json.dumps(session, separators=(",", ":") if compact else None, ensure_ascii=not compact)
+                        value = encoded.encode("utf-8")
+                        if value != raw:
+                            actions.append((
+                                key, digest, "set", value, "trimmed" if trimmed else "reencoded",
+                                len(raw), len(value), dropped
+                            ))
+                            continue
+                    size_after += len(raw)
+                
+                if archived:
+                    # The archive chunk is on disk and indexed before anything is deleted
+                    writer.sync()
+                    actions.extend(
+                        (key, digest, "del", "", "archived", size, 0, 0) for key, digest, size in archived
+                    )
+                if not actions:
+                    continue
+                if report_only:
+                    results = [1] * len(actions)
+                else:
+                    pipe = self.source_redis.pipeline(transaction=False)
+                    for key, digest, action, argument, *_ in actions:
+                        await cas(keys=[key], args=[digest, action, argument], client=pipe)
+                    results = await pipe.execute(raise_on_error=False)
+                
+                # Sizes and dropped messages only count once the write is applied
+                for (key, _, _, _, outcome, size, new_size, dropped), result in zip(actions, results):
+                    if result == 1:
+                        counts[outcome] += 1
+                        counts["messages_dropped"] += dropped
+                        size_after += new_size
+                    else:
+                        # Changed since it was read: leave it to the server
+                        counts["conflicts"] += 1
+                        size_after += size
+                        if isinstance(result, Exception):
+                            console.print(f"[red]Error compacting {key.decode('utf-8')}: {result}[/red]")
+        finally:
+            if writer:
+                writer.close()
+        
+        used_after = (await self.source_redis.info("memory")).get("used_memory", 0)
+        probed = [("Before", before)]
+        if not report_only:
+            probed.append(("After", await self.probe_sessions(probe_keys, cas)))
+        
+        table = Table(title="Session Compaction" + (" (report only)" if report_only else ""))
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="green")
+        for name, value in counts.items():
+            table.add_row(name.replace("_", " ").capitalize(), str(value))
+        table.add_row("Session bytes before", format_bytes(size_before))
+        table.add_row("Session bytes after", format_bytes(size_after))
+        table.add_row("Bytes reclaimed", format_bytes(size_before - size_after))
+        if not report_only:
+            table.add_row("Redis used_memory change", format_bytes(used_before - used_after) + " freed"
+                          if used_before >= used_after else "+" + format_bytes(used_after - used_before))
+        console.print(table)
+        
+        table = Table(title=f"Session Latency ({len(probe_keys)} active sessions)")
+        table.add_column("Operation", style="cyan")
+        for label, _ in probed:
+            table.add_column(f"{label} p50 / p95", style="yellow")
+        for operation in ("read", "write"):
+            if not before[operation].count:
+                continue
+            table.add_row(operation, *(
+                f"{probe[operation].percentile(50) * 1000:.2f}ms / {probe[operation].percentile(95) * 1000:.2f}ms"
+                for _, probe in probed
+            ))
+        table.add_row("avg size", *(format_bytes(probe["size"]) for _, probe in probed))
+        console.print(table)
+        return counts
+    
+    async def aged_sessions(self, idle_limit: float = None, read_idle: bool = True):
+        """Yield (keys, [(idle seconds, value, size)]) per page of sessions
+        
+        Over a CLIENT NO-TOUCH connection idle times and values come from
+        one pipeline. Older servers get MEMORY USAGE and OBJECT IDLETIME
+        first, then an MGET of the active sessions only, plus the idle ones
+        when `read_idle` (they are about to be archived or expired); size
+        is then MEMORY USAGE for sessions that were not read.
+        """
+        client = await self.untouched_client()
+        if client:
+            async for _, keys, values in self.scan_pages("session:*", "aged", client=client):
+                yield keys, [
+                    (idle, raw, len(raw) if isinstance(raw, bytes) else 0)
+                    for idle, raw in values
+                ]
+            return
+        
+        async for _, keys, values in self.scan_pages("session:*", "usage"):
+            wanted = [
+                key for key, (_, idle) in zip(keys, values)
+                if read_idle or not (idle_limit and isinstance(idle, int) and idle >= idle_limit)
+            ]
+            raw = dict(zip(wanted, await self.source_redis.mget(wanted))) if wanted else {}
+            yield keys, [
+                (idle, raw.get(key), len(raw[key]) if isinstance(raw.get(key), bytes) else size or 0)
+                for key, (size, idle) in zip(keys, values)
+            ]
+    
+    async def active_sessions(self, limit: int, idle_limit: float = None):
+        """Up to `limit` session keys that are not idle, for latency probes
+        
+        Sessions idle for `idle_limit`, or an hour without one, are left
+        out so the probes' reads only touch sessions already in use.
+        """
+        keys = []
+        async for key in self.source_redis.scan_iter(match="session:*", count=self.scan_count):
+            keys.append(key)
+            if len(keys) >= limit * 4:
+                break
+        if not keys:
+            return keys
+        # Check idle times without reading values, which would reset them
+        pipe = self.source_redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.object("idletime", key)
+        idle = await pipe.execute(raise_on_error=False)
+        threshold = idle_limit or ACTIVE_IDLE
+        return [key for key, seconds in zip(keys, idle) if isinstance(seconds, int) and seconds < threshold][:limit]
+    
+    async def probe_sessions(self, keys, cas=None):
+        """Time GET plus parse, and serialise plus write-back, per session
+        
+        Writes are only timed when given the compare-and-set `cas` script.
+        """
+        probe = {"read": LatencyHistogram(), "write": LatencyHistogram(), "size": 0}
+        sizes = []
+        reader = await self.untouched_client() or self.source_redis
+        for key in keys:
+            start = time.perf_counter()
+            raw = await reader.get(key)
+            if raw is None:
+                continue
+            try:
+                session = json.loads(raw)
+            except ValueError:
+                continue
+            probe["read"].record(time.perf_counter() - start)
+            sizes.append(len(raw))
+            if not cas:
+                continue
+            
+            # Serialise as an update would, but write back the stored bytes
+            start = time.perf_counter()
+            json.dumps(session)
+            await cas(keys=[key], args=[hashlib.sha1(raw).hexdigest(), "set", raw])
+            probe["write"].record(time.perf_counter() - start)
+        probe["size"] = statistics.mean(sizes) if sizes else 0
+        return probe
+    
+    async def index_footprint(self):
+        """(documents, bytes) per RediSearch index, from FT.INFO"""
+        try:
+            names = await self.source_redis.execute_command("FT._LIST")
+        except redis.ResponseError:
+            return {}
+        indexes = {}
+        for name in names:
+            raw = await self.source_redis.execute_command("FT.INFO", name)
+            info = parse_ft_info(raw)
+            size = index_size(info)
+            name = name.decode("utf-8") if isinstance(name, bytes) else name
+            indexes[name] = (int(info.get("num_docs") or 0), size)
+        return indexes
+    
+    async def sync(self, interval: float = 0.5, forward_deletes: bool = False):
+        """Continuously forward changed memories and sessions to the target
+        
+        Follows keyspace notifications for memory:* and session:* keys on
+        the source instead of rescanning it. Changes are coalesced per key
+        for `interval` seconds, re-read with one pipeline and handed to the
+        same import workers the full migration uses.
+        """
+        console.print("[bold green]Starting Redis Memory delta sync[/bold green]")
+        previous = await self.enable_notifications()
+        
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        changes = {}
+        
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                MofNCompleteColumn(),
+                console=console
+            ) as progress:
+                task = progress.add_task("Waiting for changes...", total=None)
+                workers = [
+                    asyncio.create_task(self.import_worker(queue, progress, task))
+                    for _ in range(self.concurrency)
+                ]
+                workers.append(asyncio.create_task(self.follow_changes(changes)))
+                if self.adaptive_concurrency:
+                    workers.append(asyncio.create_task(self.monitor_target()))
+                if self.pushgateway:
+                    workers.append(asyncio.create_task(self.push_metrics()))
+                
                 try:
-                    await self.import_session(session)
-                    self.stats["sessions_migrated"] += 1
-                except Exception as e:
-                    console.print(f"[red]Error migrating session: {e}[/red]")
-                    self.stats["errors"] += 1
-                progress.advance(task)
+                    while True:
+                        await asyncio.sleep(interval)
+                        await self.forward_changes(changes, queue, forward_deletes)
+                        progress.update(task, description=(
+                            f"Syncing... {self.stats['memories_migrated']} memories, "
+                            f"{self.stats['sessions_migrated']} sessions forwarded"
+                        ))
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            if previous is not None:
+                await self.restore_notifications(previous)
+            self.show_results()
+    
+    async def enable_notifications(self):
+        """Make sure the source publishes keyspace events for key changes
         
-        # Show results
-        self.show_results()
+        Needs K (keyspace channel), g (DEL/RENAME), h (hash) and $ (string)
+        events; flags already configured are kept. Returns the previous
+        setting if it had to be changed, else None.
+        """
+        required = set("Kgh$")
+        try:
+            config = await self.source_redis.config_get("notify-keyspace-events")
+            current = config.get("notify-keyspace-events", "")
+            flags = set(current)
+            if "A" in flags:
+                flags |= set("g$lshzxe")
+            if not required <= flags:
+                updated = "".join(sorted(set(current) | required))
+                await self.source_redis.config_set("notify-keyspace-events", updated)
+                console.print(
+                    f"[yellow]Changed notify-keyspace-events on the source from '{current}' to "
+                    f"'{updated}'; it is restored when the sync stops.[/yellow]"
+                )
+                return current
+        except redis.ResponseError as e:
+            console.print(
+                f"[yellow]⚠️  Could not enable keyspace notifications ({e}). "
+                f"Set notify-keyspace-events to include 'Kgh$' on the source.[/yellow]"
+            )
+        return None
     
-    async def export_memories(self):
-        """Export all memories from source Redis"""
-        memories = []
-        cursor = 0
+    async def restore_notifications(self, previous: str):
+        """Put back the notify-keyspace-events setting the sync replaced"""
+        try:
+            await self.source_redis.config_set("notify-keyspace-events", previous)
+            console.print(f"[green]Restored notify-keyspace-events to '{previous}' on the source[/green]")
+        except redis.RedisError as e:
+            console.print(
+                f"[yellow]⚠️  Could not restore notify-keyspace-events ({e}). "
+                f"Set it back to '{previous}' on the source by hand.[/yellow]"
+            )
+    
+    async def follow_changes(self, changes):
+        """Record the latest event for every changed memory/session key"""
+        db = self.source_redis.connection_pool.connection_kwargs.get("db", 0)
+        patterns = [f"__keyspace@{db}__:memory:*", f"__keyspace@{db}__:session:*"]
+        ignored = {"expire", "persist", "expired", "evicted"}
         
         while True:
-            cursor, keys = self.source_redis.scan(
-                cursor, 
-                match="memory:*",
-                count=100
-            )
+            pubsub = self.source_redis.pubsub()
+            try:
+                await pubsub.psubscribe(*patterns)
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    key = message["channel"].decode("utf-8").split(":", 1)[1]
+                    event = message["data"].decode("utf-8")
+                    if event in ignored:
+                        continue
+                    changes[key] = "del" if event in ("del", "rename_from") else "set"
+            except redis.ConnectionError as e:
+                console.print(
+                    f"[yellow]⚠️  Lost keyspace notifications ({e}); changes made while "
+                    f"disconnected are missed. A --resume run skips kinds the checkpoint "
+                    f"already marks complete, so run a fresh full migration to catch up.[/yellow]"
+                )
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+    
+    async def forward_changes(self, changes, queue, forward_deletes: bool):
+        """Queue the coalesced changes collected since the last call"""
+        if not changes:
+            return
+        
+        batch = dict(changes)
+        changes.clear()
+        
+        updated = [key for key, event in batch.items() if event == "set"]
+        records = await self.fetch_records(updated)
+        for kind, record in records:
+            await self.enqueue(queue, (kind, record, None))
+        
+        deleted = [key for key, event in batch.items() if event == "del"]
+        if forward_deletes:
+            for key in deleted:
+                await self.enqueue(queue, ("delete", {"key": key}, None))
+    
+    async def produce(self, queue, progress, task):
+        """Stream every memory and session into the import queue
+        
+        With a checkpoint, the export resumes from the saved SCAN cursors,
+        skips keys the target already acknowledged and retries the keys
+        that failed last time.
+        """
+        exported = 0
+        exports = [("memory", self.export_memories), ("session", self.export_sessions)]
+        
+        if self.checkpoint:
+            for kind, records in await self.fetch_failed():
+                keys = [record["key"] for record in records]
+                records = self.deduplicate(kind, records)
+                page = self.checkpoint.start_page(kind, None, keys, len(records))
+                for record in records:
+                    await self.enqueue(queue, (kind, record, page))
+                    exported += 1
+        
+        for kind, export in exports:
+            cursor = 0
+            if self.checkpoint:
+                if self.checkpoint.state["complete"][kind]:
+                    continue
+                cursor = self.checkpoint.state["cursors"][kind]
             
-            for key in keys:
-                memory_data = self.source_redis.hgetall(key)
-                if memory_data:
-                    memories.append({
-                        "key": key.decode('utf-8'),
-                        "data": {k.decode('utf-8'): v.decode('utf-8') for k, v in memory_data.items()}
-                    })
-            
-            if cursor == 0:
-                break
+            async for next_cursor, records in export(cursor):
+                page = None
+                keys = [record["key"] for record in records]
+                if self.checkpoint:
+                    fresh = [r for r in records if not self.checkpoint.is_done(r["key"])]
+                    self.stats["skipped"] += len(records) - len(fresh)
+                    records = fresh
+                records = self.deduplicate(kind, records)
+                if self.checkpoint:
+                    page = self.checkpoint.start_page(kind, next_cursor, keys, len(records))
+                
+                for record in records:
+                    await self.enqueue(queue, (kind, record, page))
+                    exported += 1
+                progress.update(task, description=f"Migrating to central server... ({exported} exported)")
+        
+        return exported
+    
+    def deduplicate(self, kind, records):
+        """Collapse duplicate memories and fill embeddings from the cache
+        
+        Memories whose normalised text and namespace were already claimed,
+        in this run or an earlier one against the same target, are dropped.
+        Vectors found on the source are cached by text hash; memories
+        without one pick up a cached vector for the direct Redis load.
+        """
+        if not self.dedup or kind != "memory":
+            return records
+        
+        unique = []
+        for record in records:
+            data = record["data"]
+            text = data.get("text", "")
+            if self.has_vector(record):
+                self.dedup.put_vector(self.dedup.text_hash(text), data[VECTOR_FIELD])
+            
+            if not self.dedup.claim(self.dedup.content_hash(text, data.get("namespace")), record["key"]):
+                self.stats["duplicates_collapsed"] += 1
+                continue
+            
+            if not self.has_vector(record) and self.target_redis:
+                vector = self.dedup.get_vector(self.dedup.text_hash(text))
+                if vector and len(vector) == self.vector_bytes:
+                    data[VECTOR_FIELD] = vector
+                    self.stats["embedding_cache_hits"] += 1
+            unique.append(record)
+        return unique
+    
+    async def enqueue(self, queue, item):
+        """Put an item on the import queue, timing backpressure from import"""
+        if queue.full():
+            start = time.perf_counter()
+            await queue.put(item)
+            self.metrics.wait("queue_put", time.perf_counter() - start)
+        else:
+            queue.put_nowait(item)
+    
+    async def fetch_failed(self):
+        """Re-read the records a previous run failed to import"""
+        failed = self.checkpoint.state["failed"]
+        fetched = await self.fetch_records(list(failed))
+        found = {record["key"] for _, record in fetched}
+        
+        # Keys deleted from the source since then have nothing left to migrate
+        for key in list(failed):
+            if key not in found:
+                failed.pop(key)
         
-        return memories
+        batches = {}
+        for kind, record in fetched:
+            batches.setdefault(kind, []).append(record)
+        return list(batches.items())
     
-    async def export_sessions(self):
-        """Export all sessions from source Redis"""
-        sessions = []
-        cursor = 0
+    async def fetch_records(self, keys):
+        """Pipeline-fetch and decode specific memory/session keys
+        
+        Returns (kind, record) pairs; keys that no longer exist, or hold
+        an unexpected type, are left out.
+        """
+        if self.dump:
+            return self.dump.find(keys)
         
+        records = []
+        for i in range(0, len(keys), self.pipeline_depth):
+            chunk = keys[i:i + self.pipeline_depth]
+            pipe = self.source_redis.pipeline(transaction=False)
+            for key in chunk:
+                if key.startswith("memory:"):
+                    pipe.hgetall(key)
+                else:
+                    pipe.get(key)
+            values = await pipe.execute(raise_on_error=False)
+            
+            for key, value in zip(chunk, values):
+                if not value or isinstance(value, Exception):
+                    continue
+                kind = "memory" if key.startswith("memory:") else "session"
+                record = self.decode_record(kind, key.encode(), value)
+                if record is not None:
+                    records.append((kind, record))
+        return records
+    
+    async def checkpoint_saver(self, interval: float = 5.0):
+        """Flush the checkpoint periodically while the migration runs"""
+        while True:
+            await asyncio.sleep(interval)
+            if self.checkpoint.dirty:
+                self.checkpoint.save()
+    
+    async def import_worker(self, queue, progress, task):
+        """Consume records from the queue until cancelled"""
         while True:
-            cursor, keys = self.source_redis.scan(
-                cursor,
-                match="session:*",
-                count=100
+            items = await self.next_items(queue)
+            memories = [record for kind, record, _ in items if kind == "memory"]
+            others = [(kind, record) for kind, record, _ in items if kind != "memory"]
+            try:
+                failures = await self.import_memories(memories)
+                for kind, record in others:
+                    error = await self.import_record(kind, record)
+                    if error:
+                        failures[record["key"]] = error
+                
+                if self.dedup:
+                    for memory in memories:
+                        data = memory["data"]
+                        self.dedup.settle(
+                            self.dedup.content_hash(data.get("text", ""), data.get("namespace")),
+                            memory["key"] not in failures
+                        )
+                if self.checkpoint:
+                    for kind, record, page in items:
+                        if page is None:
+                            continue
+                        self.checkpoint.done(kind, page, record["key"], failures.get(record["key"]))
+            finally:
+                for _ in items:
+                    queue.task_done()
+                progress.advance(task, len(items))
+    
+    async def import_memories(self, memories):
+        """Import memories by the cheapest route; returns key -> error failures"""
+        failures = {}
+        if self.target_redis and memories:
+            direct, memories = self.split_embedded(memories)
+            if direct:
+                failures.update(await self.bulk_load(direct))
+        
+        if self.batcher and memories:
+            failures.update(await self.import_batch(memories))
+        else:
+            for memory in memories:
+                error = await self.import_record("memory", memory)
+                if error:
+                    failures[memory["key"]] = error
+        return failures
+    
+    async def next_items(self, queue, linger: float = 0.05):
+        """Take the next record, plus up to a batch worth more in batch mode
+        
+        Waits at most `linger` seconds for a batch to fill up so that a
+        briefly empty queue does not degrade into single-record requests.
+        """
+        start = time.perf_counter()
+        items = [await queue.get()]
+        self.metrics.wait("queue_get", time.perf_counter() - start)
+        if not self.batcher or items[0][0] != "memory":
+            return items
+        
+        deadline = time.monotonic() + linger
+        while len(items) < self.batcher.size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    items.append(queue.get_nowait())
+                else:
+                    items.append(await asyncio.wait_for(queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return items
+    
+    async def import_record(self, kind, record):
+        """Import a single memory or session; returns the error, if any"""
+        try:
+            if kind == "memory":
+                await self.import_memory(record)
+                self.stats["memories_migrated"] += 1
+            elif kind == "session":
+                await self.import_session(record)
+                self.stats["sessions_migrated"] += 1
+            else:
+                await self.delete_record(record)
+                self.stats["deletes_forwarded"] += 1
+        except Exception as e:
+            console.print(f"[red]Error migrating {kind} {record['key']}: {e}[/red]")
+            self.stats["errors"] += 1
+            return str(e)
+        return None
+    
+    async def import_batch(self, memories):
+        """POST memories as one batch, bisecting rejected batches
+        
+        A batch the server rejects (400, 413, 422) is split in half and each
+        half retried, so a malformed record only fails itself rather than the
+        whole batch. Overload and server errors left after `send`'s retries,
+        and transport errors, fail the whole batch without splitting.
+        Returns a mapping of record key to error for every failed memory.
+        """
+        failures = {}
+        entries = []
+        for memory in memories:
+            try:
+                entries.append((memory["key"], self.memory_payload(memory)))
+            except Exception as e:
+                console.print(f"[red]Error migrating memory {memory['key']}: {e}[/red]")
+                self.stats["errors"] += 1
+                failures[memory["key"]] = str(e)
+        await self.post_batch(entries, failures)
+        return failures
+    
+    async def post_batch(self, entries, failures):
+        """Send (key, payload) entries, splitting on rejection"""
+        if not entries:
+            return
+        
+        start = time.perf_counter()
+        try:
+            response = await self.send(
+                "POST",
+                "/v1/long-term-memory",
+                items=len(entries),
+                json={"memories": [payload for _, payload in entries]}
             )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            self.batcher.record(time.perf_counter() - start, ok=False)
+            if e.response.status_code not in REJECT_STATUSES:
+                console.print(f"[red]Error migrating batch of {len(entries)} memories: {e}[/red]")
+                self.stats["errors"] += len(entries)
+                failures.update((key, str(e)) for key, _ in entries)
+                return
+            if len(entries) == 1:
+                console.print(f"[red]Error migrating memory {entries[0][0]}: {e}[/red]")
+                self.stats["errors"] += 1
+                failures[entries[0][0]] = str(e)
+                return
+            self.stats["batch_splits"] += 1
+            mid = len(entries) // 2
+            await self.post_batch(entries[:mid], failures)
+            await self.post_batch(entries[mid:], failures)
+            return
+        except Exception as e:
+            self.batcher.record(time.perf_counter() - start, ok=False)
+            console.print(f"[red]Error migrating batch of {len(entries)} memories: {e}[/red]")
+            self.stats["errors"] += len(entries)
+            failures.update((key, str(e)) for key, _ in entries)
+            return
+        
+        self.batcher.record(time.perf_counter() - start, ok=True)
+        self.stats["batches_sent"] += 1
+        self.stats["memories_migrated"] += len(entries)
+    
+    async def scan_pages(self, match: str, kind: str, cursor: int = 0, client=None, fields=None):
+        """Yield (cursor, keys, values) for every SCAN page matching `match`.
+
+        `kind` is "hash" (HGETALL per key, or HMGET of `fields`), "string"
+        (MGET per chunk), "aged" ([OBJECT IDLETIME, GET] per key) or
+        "usage" ([MEMORY USAGE, OBJECT IDLETIME] per key, plus HGET of
+        each of `fields` for memories). `client` defaults to the
+        source Redis.
+        The yielded cursor is where a later SCAN resumes after this page;
+        0 marks the final page.
+        Each page costs a single round trip: the values for the current
+        page are pipelined together with the SCAN for the next one. Pages
+        larger than `pipeline_depth` are split over several pipelines.
+        Only time spent waiting on Redis counts towards `export_seconds`.
+        """
+        client = client or self.source_redis
+        start = time.perf_counter()
+        cursor, keys = await client.scan(cursor, match=match, count=self.scan_count)
+        elapsed = time.perf_counter() - start
+        self.stats["export_seconds"] += elapsed
+        self.metrics.record("scan", elapsed, items=len(keys))
+        
+        while True:
+            values = []
+            next_page = None
+            chunks = [
+                keys[i:i + self.pipeline_depth]
+                for i in range(0, len(keys), self.pipeline_depth)
+            ] or [[]]
             
-            for key in keys:
-                session_data = self.source_redis.get(key)
-                if session_data:
-                    sessions.append({
-                        "key": key.decode('utf-8'),
-                        "data": json.loads(session_data)
-                    })
-            
-            if cursor == 0:
+            for i, chunk in enumerate(chunks):
+                pipe = client.pipeline(transaction=False)
+                if kind == "hash":
+                    for key in chunk:
+                        if fields:
+                            pipe.hmget(key, fields)
+                        else:
+                            pipe.hgetall(key)
+                elif kind == "aged":
+                    for key in chunk:
+                        # Idle time first: the GET resets it
+                        pipe.object("idletime", key)
+                        pipe.get(key)
+                elif kind == "usage":
+                    for key in chunk:
+                        pipe.memory_usage(key, samples=5)
+                        # Read before HGET, which resets the idle time
+                        # unless the connection is in NO-TOUCH mode
+                        pipe.object("idletime", key)
+                        if key.startswith(b"memory:"):
+                            for field in fields or ():
+                                pipe.hget(key, field)
+                elif chunk:
+                    pipe.mget(chunk)
+                
+                scan_next = cursor != 0 and i == len(chunks) - 1
+                if scan_next:
+                    pipe.scan(cursor, match=match, count=self.scan_count)
+                
+                start = time.perf_counter()
+                # OBJECT IDLETIME fails under LFU policies; that only loses the age
+                results = await pipe.execute(raise_on_error=kind not in ("usage", "aged")) if len(pipe) else []
+                elapsed = time.perf_counter() - start
+                self.stats["export_seconds"] += elapsed
+                if scan_next:
+                    next_page = results.pop()
+                    self.metrics.record("scan", 0.0 if chunk else elapsed, items=len(next_page[1]))
+                if kind == "usage":
+                    fetched, position = [], 0
+                    for key in chunk:
+                        width = 2 + len(fields or ()) if key.startswith(b"memory:") else 2
+                        fetched.append(results[position:position + width])
+                        position += width
+                elif kind == "aged":
+                    fetched = [results[j:j + 2] for j in range(0, 2 * len(chunk), 2)]
+                else:
+                    fetched = results if kind == "hash" else (results[0] if results else [])
+                values.extend(fetched)
+                if chunk:
+                    self.metrics.record(
+                        "fetch", elapsed, items=len(chunk),
+                        size=sum(value_size(value) for value in fetched)
+                    )
+            
+            self.stats["keys_exported"] += len(keys)
+            yield cursor, keys, values
+            
+            if next_page is None:
                 break
+            cursor, keys = next_page
+    
+    async def export_memories(self, cursor: int = 0):
+        """Stream all memories from source Redis as (cursor, records) pages"""
+        if self.dump:
+            async for page in self.dump_pages("memory", cursor):
+                yield page
+            return
+        async for cursor, keys, values in self.scan_pages("memory:*", "hash", cursor):
+            start = time.perf_counter()
+            records = [
+                record for record in (
+                    self.decode_record("memory", key, memory_data)
+                    for key, memory_data in zip(keys, values) if memory_data
+                ) if record is not None
+            ]
+            self.metrics.record("decode", time.perf_counter() - start, items=len(records))
+            yield cursor, records
+    
+    async def export_sessions(self, cursor: int = 0):
+        """Stream all sessions from source Redis as (cursor, records) pages"""
+        if self.dump:
+            async for page in self.dump_pages("session", cursor):
+                yield page
+            return
+        async for cursor, keys, values in self.scan_pages("session:*", "string", cursor):
+            start = time.perf_counter()
+            records = [
+                record for record in (
+                    self.decode_record("session", key, session_data)
+                    for key, session_data in zip(keys, values) if session_data
+                ) if record is not None
+            ]
+            self.metrics.record("decode", time.perf_counter() - start, items=len(records))
+            yield cursor, records
+    
+    async def dump_pages(self, kind: str, cursor: int):
+        """Dump chunks as pages, timing decompression and decoding"""
+        pages = self.dump.pages(kind, cursor)
+        while True:
+            start = time.perf_counter()
+            try:
+                page = await pages.__anext__()
+            except StopAsyncIteration:
+                return
+            self.metrics.record("decode", time.perf_counter() - start, items=len(page[1]))
+            yield page
+    
+    def decode_record(self, kind: str, key, value):
+        """Decode one memory/session value, or None if it is corrupt
+        
+        A value that is not valid UTF-8 or JSON is reported and counted as
+        an error, so one bad key does not stop the rest of the migration.
+        """
+        decode = self.decode_memory if kind == "memory" else self.decode_session
+        try:
+            return decode(key, value)
+        except (ValueError, UnicodeDecodeError) as e:
+            console.print(f"[red]Error decoding {kind} {key.decode('utf-8', 'replace')}: {e}[/red]")
+            self.stats["errors"] += 1
+            return None
+    
+    def decode_memory(self, key, memory_data):
+        data = {}
+        for k, v in memory_data.items():
+            field = k.decode('utf-8')
+            # The embedding is raw float32 bytes and is kept as-is
+            data[field] = v if field == VECTOR_FIELD else v.decode('utf-8')
+        return {
+            "key": key.decode('utf-8'),
+            "data": data
+        }
+    
+    def decode_session(self, key, session_data):
+        return {
+            "key": key.decode('utf-8'),
+            "data": json.loads(session_data)
+        }
+    
+    def memory_payload(self, memory):
+        """Build the /v1/long-term-memory entry for an exported memory"""
+        return {
+            "text": memory["data"].get("text", ""),
+            "memory_type": memory["data"].get("memory_type", "semantic"),
+            "namespace": memory["data"].get("namespace"),
+            "topics": json.loads(memory["data"].get("topics", "[]")),
+            "entities": json.loads(memory["data"].get("entities", "[]")),
+            "id": memory["data"].get("id")
+        }
+    
+    def has_vector(self, memory):
+        """Whether the memory carries an embedding of the target's dimension"""
+        vector = memory["data"].get(VECTOR_FIELD)
+        return bool(vector) and len(vector) == self.vector_bytes
+    
+    def split_embedded(self, memories):
+        """Split memories into (loadable with their vector, needing the API)"""
+        direct, embed = [], []
+        for memory in memories:
+            if self.has_vector(memory):
+                direct.append(memory)
+            else:
+                if memory["data"].get(VECTOR_FIELD):
+                    self.stats["embeddings_mismatched"] += 1
+                embed.append(memory)
+        return direct, embed
+    
+    async def bulk_load(self, memories):
+        """Write memories with their embeddings directly into the central Redis
+        
+        The hashes are copied field for field, so the existing vector,
+        topics and entities are indexed as they are and the target does
+        not embed the text again. Returns a mapping of key to error.
+        """
+        failures = {}
+        pipe = self.target_redis.pipeline(transaction=False)
+        for memory in memories:
+            pipe.hset(memory["key"], mapping=memory["data"])
         
-        return sessions
+        await self.acquire_slot()
+        start = time.perf_counter()
+        try:
+            results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            console.print(f"[red]Error loading {len(memories)} memories into target Redis: {e}[/red]")
+            self.stats["errors"] += len(memories)
+            return {memory["key"]: str(e) for memory in memories}
+        finally:
+            await self.controller.release()
+        self.metrics.record(
+            "load", time.perf_counter() - start, items=len(memories),
+            size=sum(value_size(memory["data"]) for memory in memories)
+        )
+        
+        for memory, result in zip(memories, results):
+            if isinstance(result, Exception):
+                console.print(f"[red]Error loading memory {memory['key']}: {result}[/red]")
+                self.stats["errors"] += 1
+                failures[memory["key"]] = str(result)
+            else:
+                self.stats["memories_migrated"] += 1
+                self.stats["embeddings_preserved"] += 1
+        return failures
     
     async def import_memory(self, memory):
         """Import a memory to the target server"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.target_api}/v1/long-term-memory",
-                json={
-                    "memories": [{
-                        "text": memory["data"].get("text", ""),
-                        "memory_type": memory["data"].get("memory_type", "semantic"),
-                        "namespace": memory["data"].get("namespace"),
-                        "topics": json.loads(memory["data"].get("topics", "[]")),
-                        "entities": json.loads(memory["data"].get("entities", "[]")),
-                        "id": memory["data"].get("id")
-                    }]
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
+        response = await self.send(
+            "POST",
+            "/v1/long-term-memory",
+            json={"memories": [self.memory_payload(memory)]}
+        )
+        response.raise_for_status()
     
     async def import_session(self, session):
         """Import a session to the target server"""
-        async with httpx.AsyncClient() as client:
-            session_id = session["key"].split(":")[-1]
-            response = await client.put(
-                f"{self.target_api}/v1/working-memory/{session_id}",
-                json=session["data"],
-                timeout=30.0
+        session_id = session["key"].split(":")[-1]
+        response = await self.send(
+            "PUT",
+            f"/v1/working-memory/{session_id}",
+            json=session["data"]
+        )
+        response.raise_for_status()
+    
+    async def acquire_slot(self):
+        start = time.perf_counter()
+        await self.controller.acquire()
+        self.metrics.wait("concurrency_limit", time.perf_counter() - start)
+    
+    async def send(self, method: str, url: str, items: int = 1, **kwargs):
+        """Send a target request carrying `items` records under the concurrency limit
+        
+        429 and 5xx responses and timeouts count as congestion. Overload
+        statuses and timeouts are retried with jittered exponential backoff,
+        honouring Retry-After; other responses are returned to the caller.
+        """
+        op = f"{method} {route_of(url)}"
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_slot()
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TimeoutException:
+                self.controller.congestion()
+                if attempt == self.max_retries:
+                    raise
+                response = None
+            finally:
+                await self.controller.release()
+            
+            elapsed = time.perf_counter() - start
+            self.metrics.request(op, elapsed)
+            if response is not None:
+                self.metrics.record(
+                    "post", elapsed, items=items,
+                    size=len(response.request.content) + len(response.content)
+                )
+            
+            if response is not None and response.status_code != 429 and response.status_code < 500:
+                self.controller.success(time.perf_counter() - start)
+                return response
+            
+            retry_after = None
+            if response is not None:
+                try:
+                    retry_after = float(response.headers.get("Retry-After", ""))
+                except ValueError:
+                    pass
+                self.controller.congestion(retry_after)
+                if response.status_code not in (429, 502, 503, 504) or attempt == self.max_retries:
+                    return response
+            
+            self.stats["retries"] += 1
+            backoff = retry_after or min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+            await asyncio.sleep(backoff)
+            self.metrics.wait("retry_backoff", backoff)
+    
+    async def push_metrics(self, interval: float = 10.0):
+        """Push metrics to a Prometheus Pushgateway until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.push_metrics_once()
+    
+    async def push_metrics_once(self):
+        try:
+            response = await self.probe_client.put(
+                f"{self.pushgateway.rstrip('/')}/metrics/job/redis_memory_migration",
+                content=self.metrics.exposition(self.stats),
+                headers={"Content-Type": "text/plain; version=0.0.4"}
             )
             response.raise_for_status()
+        except httpx.HTTPError as e:
+            console.print(f"[yellow]⚠️  Could not push metrics: {e}[/yellow]")
+    
+    def write_report(self, path: str, config=None):
+        """Write the per-stage performance report as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.metrics.report(self.stats, config), f, indent=2)
+        console.print(f"Performance report written to {path}")
+    
+    async def monitor_target(self, interval: float = 1.0):
+        """Feed target health into the AIMD controller
+        
+        Probes /v1/health, whose latency tracks what live agents see, and
+        optionally the depth of the task-worker queue on the target Redis.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            start = time.perf_counter()
+            try:
+                response = await self.probe_client.get("/v1/health")
+                if time.perf_counter() - start > self.max_probe_latency or response.status_code >= 500:
+                    self.controller.congestion()
+            except httpx.HTTPError:
+                self.controller.congestion()
+            
+            if self.task_queue_key and self.target_redis:
+                try:
+                    if await self.task_queue_depth() > self.max_task_queue:
+                        self.controller.congestion()
+                except redis.RedisError as e:
+                    console.print(f"[yellow]⚠️  Cannot read task queue depth: {e}[/yellow]")
+                    self.task_queue_key = None
+    
+    async def task_queue_depth(self):
+        key_type = (await self.target_redis.type(self.task_queue_key)).decode()
+        if key_type == "stream":
+            return await self.target_redis.xlen(self.task_queue_key)
+        if key_type == "zset":
+            return await self.target_redis.zcard(self.task_queue_key)
+        if key_type == "list":
+            return await self.target_redis.llen(self.task_queue_key)
+        return 0
+    
+    async def delete_record(self, record):
+        """Delete a memory or session on the target server
+        
+        The ID is taken from the key, as it is for sessions on import;
+        the source hash is already gone by the time the delete is seen.
+        """
+        prefix, record_id = record["key"].split(":", 1)
+        if prefix == "memory":
+            response = await self.send(
+                "DELETE",
+                "/v1/long-term-memory",
+                params={"memory_ids": [record_id]}
+            )
+        else:
+            response = await self.send("DELETE", f"/v1/working-memory/{record_id}")
+        response.raise_for_status()
+    
+    async def close(self):
+        """Release the source connection pool and the target HTTP clients"""
+        await self.client.aclose()
+        await self.probe_client.aclose()
+        await self.source_redis.aclose()
+        if self.untouched:
+            await self.untouched.aclose()
+        if self.target_redis:
+            await self.target_redis.aclose()
+        if self.dedup:
+            self.dedup.close()
+        if self.dump:
+            self.dump.close()
+    
+    def export_rate(self):
+        """Keys per second reached by the SCAN/pipeline export"""
+        if self.stats["export_seconds"] <= 0:
+            return 0.0
+        return self.stats["keys_exported"] / self.stats["export_seconds"]
+    
+    def show_stages(self):
+        """Display per-stage throughput, waits and request latencies"""
+        report = self.metrics.report(self.stats)
+        table = Table(title="Stage Breakdown")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Items", style="green")
+        table.add_column("Data", style="green")
+        table.add_column("Busy", style="yellow")
+        table.add_column("Rate", style="yellow")
+        for stage, entry in report["stages"].items():
+            if entry["items"] or entry["seconds"]:
+                table.add_row(
+                    stage,
+                    str(entry["items"]),
+                    format_bytes(entry["bytes"]),
+                    f"{entry['seconds']:.2f}s",
+                    f"{entry['items_per_second']:,.0f}/s"
+                )
+        for wait, seconds in report["waits_seconds"].items():
+            if seconds:
+                table.add_row(f"wait: {wait}", "", "", f"{seconds:.2f}s", "")
+        for op, latency in report["latency"].items():
+            table.add_row(
+                op, str(latency["count"]), "",
+                f"p50 {latency['p50_ms']:.0f}ms",
+                f"p95 {latency['p95_ms']:.0f}ms / p99 {latency['p99_ms']:.0f}ms"
+            )
+        console.print(table)
     
     def show_results(self):
         """Display migration results"""
@@ -165,9 +2359,35 @@ class MemoryMigrator:
         table.add_row("Total Items", str(
             self.stats["memories_migrated"] + self.stats["sessions_migrated"]
         ))
+        if self.batcher:
+            table.add_row("Batches Sent", str(self.stats["batches_sent"]))
+            table.add_row("Batch Splits", str(self.stats["batch_splits"]))
+            table.add_row("Final Batch Size", str(self.batcher.size))
+        if self.target_redis:
+            table.add_row("Embeddings Preserved", str(self.stats["embeddings_preserved"]))
+            table.add_row("Embeddings Mismatched", str(self.stats["embeddings_mismatched"]))
+        if self.dedup:
+            table.add_row("Duplicates Collapsed", str(self.stats["duplicates_collapsed"]))
+            table.add_row("Embedding Cache Hits", str(self.stats["embedding_cache_hits"]))
+            table.add_row("Embeddings Saved", str(
+                self.stats["duplicates_collapsed"] + self.stats["embedding_cache_hits"]
+            ))
+        if self.stats["retries"]:
+            table.add_row("Retries", str(self.stats["retries"]))
+        if self.adaptive_concurrency:
+            table.add_row("Throttle Events", str(self.controller.decreases))
+            table.add_row("Final Concurrency", str(int(self.controller.limit)))
+        if self.stats["deletes_forwarded"]:
+            table.add_row("Deletes Forwarded", str(self.stats["deletes_forwarded"]))
+        if self.checkpoint:
+            table.add_row("Skipped (already migrated)", str(self.stats["skipped"]))
+            table.add_row("Failed (in checkpoint)", str(len(self.checkpoint.state["failed"])))
+        table.add_row("Keys Exported", str(self.stats["keys_exported"]))
+        table.add_row("Export Rate", f"{self.export_rate():,.0f} keys/s")
         
         console.print("\n")
         console.print(table)
+        self.show_stages()
         
         if self.stats["errors"] > 0:
             console.print("\n[yellow]⚠️  Migration completed with errors. Please review logs.[/yellow]")
@@ -189,28 +2409,401 @@ async def main():
         default="http://10.10.20.85:8000",
         help="Target API URL (default: http://10.10.20.85:8000)"
     )
+    parser.add_argument(
+        "--scan-count",
+        type=int,
+        default=1000,
+        help="SCAN COUNT hint, i.e. keys fetched per page (default: 1000)"
+    )
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=1000,
+        help="Maximum commands sent per pipeline round trip (default: 1000)"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=1000,
+        help="Maximum records buffered between export and import (default: 1000)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Maximum import requests in flight against the target (default: 8)"
+    )
+    parser.add_argument(
+        "--adaptive-concurrency",
+        action="store_true",
+        help="Ramp in-flight requests up to --concurrency with AIMD, backing off "
+             "on 429/5xx responses, slow health probes or a deep task queue"
+    )
+    parser.add_argument(
+        "--max-probe-latency",
+        type=float,
+        default=0.2,
+        help="Target /v1/health latency in seconds above which imports back off (default: 0.2)"
+    )
+    parser.add_argument(
+        "--task-queue-key",
+        help="Task-worker queue key on --target-redis whose depth is watched for backpressure"
+    )
+    parser.add_argument(
+        "--max-task-queue",
+        type=int,
+        default=1000,
+        help="Task queue depth above which imports back off (default: 1000)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Initial memories per POST; values above 1 enable adaptive batching (default: 1)"
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=500,
+        help="Upper bound for the adaptive batch size (default: 500)"
+    )
+    parser.add_argument(
+        "--target-latency",
+        type=float,
+        default=2.0,
+        help="Batch request latency in seconds the batch sizer aims for (default: 2.0)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="migration-checkpoint.json",
+        help="File used to record migration progress (default: migration-checkpoint.json)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume from --checkpoint, skipping records the target already acknowledged"
+    )
+    parser.add_argument(
+        "--target-redis",
+        help="Target Redis URL; memories that already have an embedding are "
+             "loaded straight into the central index instead of being re-embedded"
+    )
+    parser.add_argument(
+        "--vector-dim",
+        type=int,
+        default=1536,
+        help="Embedding dimension of the target index (default: 1536, text-embedding-3-small)"
+    )
+    parser.add_argument(
+        "--dedup-cache",
+        help="SQLite file used to collapse duplicate memories and cache embeddings across runs"
+    )
+    parser.add_argument(
+        "--report",
+        help="Write a JSON performance report (per-stage throughput, latency percentiles) here"
+    )
+    parser.add_argument(
+        "--pushgateway",
+        help="Prometheus Pushgateway URL to push migration metrics to during the run"
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Run continuously, forwarding only memory/session keys that change on the source"
+    )
+    parser.add_argument(
+        "--sync-interval",
+        type=float,
+        default=0.5,
+        help="Seconds to coalesce changes before forwarding them (default: 0.5)"
+    )
+    parser.add_argument(
+        "--sync-deletes",
+        action="store_true",
+        help="Also delete memories/sessions on the target when they are deleted on the source"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
-        help="Show what would be migrated without actually migrating"
+        help="Estimate counts, sizes and duration without writing to the target"
+    )
+    parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=1000,
+        help="Keys sampled from the source by --dry-run (default: 1000)"
+    )
+    
+    subparsers = parser.add_subparsers(dest="command")
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Write the source memories and sessions to a compressed dump file"
+    )
+    export_parser.add_argument("file", help="Dump file to write")
+    export_parser.add_argument(
+        "--chunk-records",
+        type=int,
+        default=1000,
+        help="Records per compressed chunk (default: 1000)"
+    )
+    load_parser = subparsers.add_parser(
+        "load",
+        help="Import a dump file into the target without a live source"
+    )
+    load_parser.add_argument("file", help="Dump file to read")
+    analyze_parser = subparsers.add_parser(
+        "analyze",
+        help="Break down source memory use by key family, namespace and session age"
+    )
+    analyze_parser.add_argument("--match", default="*", help="SCAN pattern to analyze (default: *)")
+    analyze_parser.add_argument(
+        "--rate",
+        type=float,
+        default=2000.0,
+        help="Maximum keys inspected per second (default: 2000)"
+    )
+    analyze_parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Largest keys and groups to list (default: 20)"
+    )
+    compact_parser = subparsers.add_parser(
+        "compact-sessions",
+        help="Trim session history to the window and expire or archive idle sessions"
+    )
+    compact_parser.add_argument(
+        "--window-size",
+        type=int,
+        default=int(os.getenv("WINDOW_SIZE", "20")),
+        help="Messages to keep per session (default: $WINDOW_SIZE or 20)"
+    )
+    compact_parser.add_argument(
+        "--idle-days",
+        type=float,
+        help="Treat sessions untouched for this many days as idle"
+    )
+    compact_parser.add_argument(
+        "--archive",
+        help="Write idle sessions to this new dump file (loadable with 'load') and delete them"
+    )
+    compact_parser.add_argument(
+        "--expire-in",
+        type=int,
+        default=86400,
+        help="TTL in seconds for idle sessions when not archiving (default: 86400)"
+    )
+    compact_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Re-encode sessions as JSON without whitespace or ASCII escapes"
+    )
+    compact_parser.add_argument(
+        "--probes",
+        type=int,
+        default=100,
+        help="Active sessions to time reads and writes on, before and after (default: 100)"
+    )
+    compact_parser.add_argument(
+        "--report-only",
+        action="store_true",
+        help="Report what would change without writing anything"
+    )
+    verify_parser = subparsers.add_parser(
+        "verify",
+        help="Compare source memories with the target Redis (--target-redis) using bucket digests"
+    )
+    verify_parser.add_argument(
+        "--depth",
+        type=int,
+        default=4,
+        help="Hex digits of the ID hash per leaf bucket (default: 4, i.e. 65536 buckets)"
+    )
+    verify_parser.add_argument(
+        "--show",
+        type=int,
+        default=20,
+        help="Differing memory IDs to list per category (default: 20)"
     )
     
     args = parser.parse_args()
     
+    if args.command == "export":
+        migrator = MemoryMigrator(
+            args.source,
+            args.target,
+            scan_count=args.scan_count,
+            pipeline_depth=args.pipeline_depth
+        )
+        try:
+            await migrator.export_dump(args.file, args.chunk_records)
+        finally:
+            await migrator.close()
+        return
+    
+    if args.command == "analyze":
+        migrator = MemoryMigrator(
+            args.source,
+            args.target,
+            scan_count=args.scan_count,
+            pipeline_depth=args.pipeline_depth
+        )
+        try:
+            await migrator.analyze(args.match, args.rate, args.top)
+        finally:
+            await migrator.close()
+        return
+    
+    if args.command == "compact-sessions":
+        if args.archive and not args.idle_days:
+            console.print("[red]--archive needs --idle-days to select the sessions to archive[/red]")
+            sys.exit(1)
+        if args.archive and not args.report_only and (
+            os.path.exists(args.archive) or os.path.exists(args.archive + ".index")
+        ):
+            console.print(
+                f"[red]{args.archive} already exists; archived sessions are deleted from Redis, "
+                f"so use a new archive path for every run[/red]"
+            )
+            sys.exit(1)
+        migrator = MemoryMigrator(
+            args.source,
+            args.target,
+            scan_count=args.scan_count,
+            pipeline_depth=args.pipeline_depth
+        )
+        try:
+            await migrator.compact_sessions(
+                window_size=args.window_size,
+                idle_days=args.idle_days,
+                archive=args.archive,
+                expire_in=args.expire_in,
+                compact=args.compact,
+                probes=args.probes,
+                report_only=args.report_only
+            )
+        finally:
+            await migrator.close()
+        return
+    
+    if args.command == "verify":
+        if not args.target_redis:
+            console.print("[red]verify reads the target keyspace and needs --target-redis[/red]")
+            sys.exit(1)
+        migrator = MemoryMigrator(
+            args.source,
+            args.target,
+            scan_count=args.scan_count,
+            pipeline_depth=args.pipeline_depth,
+            target_redis_url=args.target_redis
+        )
+        try:
+            matched = await migrator.verify(args.depth, args.show)
+        finally:
+            await migrator.close()
+        if not matched:
+            sys.exit(1)
+        return
+    
+    dump = None
+    if args.command == "load":
+        try:
+            dump = DumpReader(args.file)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Cannot read dump: {e}[/red]")
+            sys.exit(1)
+        if args.sync:
+            console.print("[red]--sync follows a live source and cannot be used with load[/red]")
+            sys.exit(1)
+        console.print(
+            f"Loading {dump.count('memory')} memories and "
+            f"{dump.count('session')} sessions from {args.file}"
+        )
+    
+    if args.task_queue_key and not args.target_redis:
+        console.print("[red]--task-queue-key needs --target-redis to read the queue[/red]")
+        sys.exit(1)
+    
+    if args.dry_run:
+        # Planning only reads from the source and the target
+        migrator = MemoryMigrator(
+            args.source,
+            args.target,
+            scan_count=args.scan_count,
+            pipeline_depth=args.pipeline_depth,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            max_batch_size=args.max_batch_size,
+            target_redis_url=args.target_redis,
+            vector_dim=args.vector_dim,
+            dump=dump
+        )
+        try:
+            await migrator.plan(args.sample_size)
+        finally:
+            await migrator.close()
+        return
+    
     # Create backup warning
     console.print("[bold yellow]⚠️  WARNING: Migration will modify the target server![/bold yellow]")
     console.print("Please ensure you have a backup before proceeding.\n")
     
-    if not args.dry_run:
-        confirm = console.input("Continue with migration? [y/N]: ")
-        if confirm.lower() != 'y':
-            console.print("[red]Migration cancelled.[/red]")
-            sys.exit(0)
+    confirm = console.input("Continue with migration? [y/N]: ")
+    if confirm.lower() != 'y':
+        console.print("[red]Migration cancelled.[/red]")
+        sys.exit(0)
+    
+    checkpoint = MigrationCheckpoint(args.checkpoint, args.file if dump else args.source, args.target)
+    if args.resume:
+        try:
+            if checkpoint.load():
+                console.print(f"[cyan]Resuming from checkpoint {args.checkpoint}[/cyan]")
+            else:
+                console.print(f"[yellow]No checkpoint at {args.checkpoint}, starting from scratch[/yellow]")
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
+            sys.exit(1)
     
     # Run migration
-    migrator = MemoryMigrator(args.source, args.target)
-    await migrator.migrate()
+    migrator = MemoryMigrator(
+        args.source,
+        args.target,
+        scan_count=args.scan_count,
+        pipeline_depth=args.pipeline_depth,
+        queue_size=args.queue_size,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        max_batch_size=args.max_batch_size,
+        target_latency=args.target_latency,
+        checkpoint=None if args.sync else checkpoint,
+        target_redis_url=args.target_redis,
+        vector_dim=args.vector_dim,
+        dedup=DedupCache(args.dedup_cache, args.target) if args.dedup_cache and not args.sync else None,
+        dump=dump,
+        adaptive_concurrency=args.adaptive_concurrency,
+        max_probe_latency=args.max_probe_latency,
+        task_queue_key=args.task_queue_key,
+        max_task_queue=args.max_task_queue,
+        pushgateway=args.pushgateway
+    )
+    try:
+        if args.sync:
+            await migrator.sync(args.sync_interval, args.sync_deletes)
+        else:
+            await migrator.migrate()
+    finally:
+        if args.report:
+            migrator.write_report(args.report, config={
+                key: value for key, value in vars(args).items() if key != "command"
+            })
+        if args.pushgateway:
+            await migrator.push_metrics_once()
+        await migrator.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Interrupted by user[/yellow]")
+        sys.exit(1)
\ No newline at end of file